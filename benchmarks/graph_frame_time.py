@@ -0,0 +1,61 @@
+"""Measures GraphWidget frame time before/after the blitting render path.
+
+Run headless from the repo root:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.graph_frame_time
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from controllers.graph_controller import GraphWidget
+
+
+def legacy_plot(graph):
+    """The original per-sample render: clear, re-decorate, relayout and full draw"""
+    graph.ax.clear()
+    graph.ax.set_facecolor('#242424')
+    x, y = graph.store.window(graph.y_l)
+    graph.ax.plot(x, y, linestyle='-', color='yellow', linewidth=0.5)
+    latest_time = x[-1]
+    start_time = max(0, latest_time - graph.time_window)
+    graph.ax.set_xlim(start_time - 1, latest_time)
+    graph.ax.set_title(f"{graph.title}", color='white', fontsize=7)
+    graph.ax.set_xlabel(f"{graph.x_l}", color='white', fontsize=6)
+    graph.ax.set_ylabel(f"{graph.y_l}", color='white', fontsize=6)
+    graph.ax.tick_params(colors='white', labelsize=5)
+    graph.figure.tight_layout(pad=0)
+    graph.canvas.draw()
+
+
+def run(render, frames=300, rate=10):
+    """Feeds one sample per frame and returns the mean frame time in ms"""
+    graph = GraphWidget(router=None, title="Bench", x_lab="time", y_lab="LMV")
+    graph.resize(600, 200)
+    graph.show()
+    while graph.resizing:  # Let the deferred post-resize layout finish first
+        QApplication.processEvents()
+
+    elapsed = 0.0
+    for i in range(frames):
+        graph.store.append({"time": [i / rate], "LMV": [(i * 7919) % 50 / 10]})
+        start = time.perf_counter()
+        render(graph)
+        QApplication.processEvents()
+        elapsed += time.perf_counter() - start
+    graph.close()
+    return elapsed / frames * 1000
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    before = run(legacy_plot)
+    after = run(GraphWidget.plot_graph)
+    print(f"legacy full redraw: {before:7.2f} ms/frame")
+    print(f"blitted line:       {after:7.2f} ms/frame  ({before / after:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
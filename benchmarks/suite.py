@@ -0,0 +1,419 @@
+"""Headless benchmarks for the ingestion, parsing and rendering hot paths.
+
+Every case runs on the Qt offscreen platform and the results are written as JSON (one file per
+run, tagged with the git commit) so two versions can be compared directly. Run from the repo root:
+
+    python -m benchmarks.suite                      # everything, saved to benchmarks/results/
+    python -m benchmarks.suite --quick --only graph pitch
+    python -m benchmarks.suite --compare benchmarks/results/<older run>.json
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PyQt6.QtCore import QT_VERSION_STR, Qt
+from PyQt6.QtWidgets import QApplication
+from misc.file_handler import get_file_path
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def timings(samples):
+    """Summary of a list of durations in seconds, reported in ms"""
+    samples = np.asarray(samples) * 1000
+    return {"runs": len(samples), "mean_ms": float(samples.mean()), "p50_ms": float(np.percentile(samples, 50)),
+            "p95_ms": float(np.percentile(samples, 95)), "min_ms": float(samples.min())}
+
+
+def free_port(kind):
+    with socket.socket(socket.AF_INET, kind) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_listening(port, timeout=5.0):
+    """Blocks until something accepts TCP connections on localhost:port, so the command link
+    doesn't start with a burst of refused connects"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return True
+        except OSError:
+            time.sleep(0.01)
+    return False
+
+
+# // Cases // #
+def bench_separator(quick):
+    """Messages per second through DataEmitter.separator"""
+    from controllers.data_parser import DataEmitter
+    emitter = DataEmitter()
+    messages = [{"SENSOR": [1.0, 2.0, 3.0]}, {"VALVES": [0, 1, 2]}, {"TEST": "x"},
+                {"SENSOR": [4.0], "VALVES": [1], "WARNING": "High Press"}]
+    count = 20000 if quick else 200000
+    start = time.perf_counter()
+    for i in range(count):
+        emitter.separator(messages[i % len(messages)])
+    seconds = time.perf_counter() - start
+    return {"messages": count, "seconds": seconds, "messages_per_s": count / seconds}
+
+
+def bench_graph(quick):
+    """GraphWidget.update_data (ingest only) and plot_graph (blitted frame) against history length"""
+    from controllers.graph_controller import GraphWidget
+    from controllers.render_clock import RenderClock
+    rate = 1000
+    batch = 10  # Samples per update, one routed packet
+    frames = 50 if quick else 200
+    clock = RenderClock(fps=1)  # update_data only marks the graph dirty; frames are timed separately
+    result = {}
+    for history in (1000, 10000, 100000):
+        x = np.arange(history) / rate
+        y = np.sin(x) + np.random.default_rng(0).normal(0, 0.1, history)
+        graph = GraphWidget(router=None, title="Bench", x_lab="time", y_lab="LMV", time_window=history / rate,
+                            sample_rate=rate, render_clock=clock)
+        graph.store.append({"time": x, "LMV": y})
+        graph.resize(600, 200)
+        graph.show()
+        while graph.resizing:
+            QApplication.processEvents()
+
+        updates, paints = [], []
+        t = x[-1]
+        for _ in range(frames):
+            new_x = t + np.arange(1, batch + 1) / rate
+            new_y = np.sin(new_x)
+            t = new_x[-1]
+            start = time.perf_counter()
+            graph.update_data(new_x, new_y)
+            updates.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            graph.plot_graph()
+            QApplication.processEvents()
+            paints.append(time.perf_counter() - start)
+        clock.dirty.clear()
+        graph.close()
+        result[str(history)] = {"update_data": timings(updates), "plot_graph": timings(paints)}
+    return result
+
+
+def bench_pitch(quick):
+    """Rocket2DImagePitch.paintEvent cost over a sweep of angles, first pass and repeated"""
+    from controllers.model_maker import Rocket2DImagePitch
+    widget = Rocket2DImagePitch(image_path=str(get_file_path("data/images/rocket_side_profile_pointed.png")),
+                                rotate_start=90)
+    widget.resize(200, 200)
+    widget.show()
+    QApplication.processEvents()
+
+    angles = 20 * np.sin(np.arange(200 if quick else 2000) * 0.05)  # Pitching within +/-20 deg
+    passes = []
+    for _ in range(2):  # The second pass paints angles that have been seen before
+        samples = []
+        for angle in angles:
+            widget.set_angle(angle)
+            start = time.perf_counter()
+            widget.repaint()  # Synchronous paintEvent
+            samples.append(time.perf_counter() - start)
+        passes.append(samples)
+    widget.close()
+    result = timings(passes[0] + passes[1])
+    result["first_pass"] = timings(passes[0])
+    result["repeat_pass"] = timings(passes[1])
+    return result
+
+
+def bench_stl(quick):
+    """Rocket3DWidget.create_rocket load time for the bundled STL, warm and in a fresh interpreter"""
+    from controllers.model_maker import Rocket3DWidget
+    filename = get_file_path("data/rocket_stl_test.STL")
+    widget = Rocket3DWidget()
+    samples, normals = [], []
+    for _ in range(3 if quick else 10):
+        widget.gl_widget.removeItem(widget.rocket)
+        start = time.perf_counter()
+        widget.create_rocket(filename=str(filename))
+        samples.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        widget.rocket.opts["meshdata"].vertexNormals()  # Smooth shading needs these on the first paint
+        normals.append(time.perf_counter() - start)
+    result = timings(samples)
+    result["normals"] = timings(normals)
+    result["triangles"] = int(len(widget.rocket.opts["meshdata"].faces()))
+    widget.close()
+
+    # What startup pays: imports plus the first load, with nothing warmed up
+    cold = ("import os, time; os.environ['QT_QPA_PLATFORM'] = 'offscreen'; start = time.perf_counter(); "
+            "from PyQt6.QtWidgets import QApplication; app = QApplication([]); "
+            "from controllers.model_maker import Rocket3DWidget; Rocket3DWidget(); "
+            "print(time.perf_counter() - start)")
+    runs = [float(subprocess.run([sys.executable, "-c", cold], capture_output=True, text=True,
+                                 cwd=get_file_path(".")).stdout.split()[-1]) for _ in range(3)]
+    result["cold_start"] = timings(runs)
+    return result
+
+
+def bench_pipeline(quick):
+    """Samples per second from UDP (the ESP32 simulator) through DataController to the router"""
+    from controllers import wifi_controller, telemetry_router, telemetry_store, telemetry_packet
+    from misc.esp32_simulator import ESP32Simulator
+    import asyncio
+
+    duration = 2.0 if quick else 5.0
+    result = {}
+    for rate in (1000, 10000, 50000):
+        tcp_port, udp_port = free_port(socket.SOCK_STREAM), free_port(socket.SOCK_DGRAM)
+        esp = wifi_controller.ESP32(tcp_port=tcp_port, udp_port=udp_port, ip="127.0.0.1")
+        data_controller = wifi_controller.DataController(esp_instance=esp)
+        data_controller.simulate = False
+        router = telemetry_router.TelemetryRouter(data_controller=data_controller,
+                                                  store=telemetry_store.TelemetryStore.from_config(telemetry_packet.config))
+        received = [0]
+
+        def count(x, y):
+            received[0] += len(x)
+        router.subscribe(("time", wifi_controller.SENSORS[0]), count)
+
+        # Batch frames like the firmware would at high rates, but never past one Ethernet frame
+        per_datagram = min(max(1, rate // 2000), wifi_controller.MAX_DATAGRAM // telemetry_packet.PACKET_SIZE)
+        simulator = ESP32Simulator(target=("127.0.0.1", udp_port), tcp_port=tcp_port, rate=rate,
+                                   frames_per_datagram=per_datagram, seed=0)
+        simulator.report_stats = lambda: asyncio.sleep(duration + 1)  # Keep the console quiet
+        data_controller.start()
+        sender = threading.Thread(target=asyncio.run, args=(simulator.run(duration),), daemon=True)
+        sender.start()
+        wait_listening(tcp_port)
+        esp.connect()
+        early = simulator.stats["frames"]  # Sent before the receiver was bound, never counted
+
+        start = time.perf_counter()
+        while sender.is_alive() and time.perf_counter() - start < duration + 2:
+            QApplication.processEvents()
+            time.sleep(0.001)
+        drain_until = time.perf_counter() + 0.5  # Let the tail through
+        while time.perf_counter() < drain_until:
+            QApplication.processEvents()
+        seconds = time.perf_counter() - start
+
+        esp.disconnect()
+        data_controller.stop()
+        data_controller.wait()
+        sent = simulator.stats["frames"] - early
+        result[str(rate)] = {"sent": sent, "received": received[0], "seconds": seconds,
+                             "samples_per_s": received[0] / duration,
+                             "delivered": received[0] / sent if sent else 0.0,
+                             "mean_batch": esp.stats["mean_batch"]}
+    return result
+
+
+def hold_gil(seconds):
+    """Busy for about `seconds` inside one C call, so no other thread of this process runs meanwhile"""
+    start = time.perf_counter()
+    sum(range(10 ** 6))
+    per_million = time.perf_counter() - start
+    sum(range(int(seconds / per_million * 10 ** 6)))
+
+
+def bench_ingest(quick):
+    """Frames delivered at 50 kHz across a GUI thread stall, in-process receive vs IngestProcess"""
+    from controllers import wifi_controller, telemetry_packet
+    from controllers.ingest_process import IngestProcess
+
+    rate, duration = 50000, 4.0
+    per_datagram = wifi_controller.MAX_DATAGRAM // telemetry_packet.PACKET_SIZE
+    result = {}
+    for stall in (1.0, 2.0):
+        for mode in ("in_process", "ingest_process"):
+            tcp_port, udp_port = free_port(socket.SOCK_STREAM), free_port(socket.SOCK_DGRAM)
+            seqs = []
+            if mode == "ingest_process":
+                ingest = IngestProcess(udp_port=udp_port, capacity=2 ** 18)
+                ingest.start()
+                time.sleep(1.0)  # Spawned interpreter importing numpy
+
+                def poll():
+                    data = ingest.read()
+                    if data is not None:
+                        seqs.append(data["seq"])
+            else:
+                esp = wifi_controller.ESP32(tcp_port=tcp_port, udp_port=udp_port, ip="127.0.0.1")
+                # Batches wait on the GUI thread's event queue until it is free, like the live pipeline
+                esp.data_list.connect(lambda records, at: seqs.append(records["seq"]),
+                                      type=Qt.ConnectionType.QueuedConnection)
+                poll = QApplication.processEvents
+
+            # The sender is its own process, the stall must only hit the receiving side
+            sender = subprocess.Popen([sys.executable, "-m", "misc.esp32_simulator", "--rate", str(rate),
+                                       "--udp-port", str(udp_port), "--tcp-port", str(tcp_port),
+                                       "--frames-per-datagram", str(per_datagram), "--duration", str(duration)],
+                                      cwd=get_file_path("."), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            if mode == "in_process":
+                wait_listening(tcp_port)  # The simulator's command server, then the receiver
+                esp.connect()
+            start = time.perf_counter()
+            stalled = False
+            while sender.poll() is None and time.perf_counter() - start < duration + 5:
+                poll()
+                if not stalled and time.perf_counter() - start > duration / 3:
+                    stalled = True
+                    hold_gil(stall)  # Like a long full redraw
+                time.sleep(1 / 30)
+            drain_until = time.perf_counter() + 0.5
+            while time.perf_counter() < drain_until:
+                poll()
+                time.sleep(0.01)
+
+            if mode == "ingest_process":
+                ingest.stop()
+            else:
+                esp.disconnect()
+            sender.wait()
+            seq = np.concatenate(seqs) if seqs else np.empty(0)
+            # Frames are numbered in order; any sent before the receiver was bound don't count
+            sent = int(seq.max() - seq.min()) + 1 if len(seq) else 0
+            result[f"{mode}_{stall:g}s"] = {"sent": sent, "received": len(seq),
+                                            "delivered": len(seq) / sent if sent else 0.0}
+    return result
+
+
+def bench_valves(quick):
+    """ValvePanel.set_bits when nothing, one valve or every valve changes, and the repaint after"""
+    from controllers import telemetry_packet
+    from controllers.valve_panel import ValvePanel
+    config = telemetry_packet.config
+    panel = ValvePanel(config["VALVES"], config["Valve_ColorMap"])
+    panel.resize(300, panel.minimumHeight())
+    panel.show()
+    QApplication.processEvents()
+    everything = (1 << len(config["VALVES"])) - 1
+    runs = 2000 if quick else 20000
+    result = {}
+    for case, toggle in (("unchanged", 0), ("one_valve", 1), ("all_valves", everything)):
+        bits = 0
+        updates, paints = [], []
+        for i in range(runs):
+            bits ^= toggle
+            column = np.full(10, bits, dtype=np.uint16)  # A routed packet's VALVES column
+            start = time.perf_counter()
+            panel.set_bits(column)
+            updates.append(time.perf_counter() - start)
+            if i % 20 == 0:
+                start = time.perf_counter()
+                panel.repaint()
+                paints.append(time.perf_counter() - start)
+        result[case] = {"set_bits": timings(updates), "full_repaint": timings(paints)}
+    panel.close()
+    return result
+
+
+def bench_store(quick):
+    """TelemetryStore.append for one decoded packet of every channel, against packet size"""
+    from controllers import telemetry_packet
+    from controllers.telemetry_store import TelemetryStore
+    store = TelemetryStore.from_config(telemetry_packet.config)
+    packets = 500 if quick else 5000
+    rng = np.random.default_rng(0)
+    result = {"channels": len(store.channels),
+              "megabytes": sum(ring._data.nbytes for ring in [store.time, store.values] +
+                               [ring for level in store.levels for ring in level]) / 2 ** 20}
+    seq = 0
+    for frames in (1, 10, 60):
+        samples = []
+        for _ in range(packets):
+            records = telemetry_packet.decode(telemetry_packet.encode(
+                np.arange(seq, seq + frames), np.arange(seq, seq + frames) * 1000,
+                rng.normal(size=(frames, len(telemetry_packet.SENSORS))), seq & 0x3FF))
+            seq += frames
+            data = telemetry_packet.to_channels(records)
+            start = time.perf_counter()
+            store.append(data)
+            samples.append(time.perf_counter() - start)
+        result[str(frames)] = {"append": timings(samples)}
+    return result
+
+
+CASES = {"separator": bench_separator, "graph": bench_graph, "pitch": bench_pitch, "stl": bench_stl,
+         "pipeline": bench_pipeline, "store": bench_store, "ingest": bench_ingest,
+         "valves": bench_valves}
+
+
+# // Reporting // #
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=get_file_path(".")).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {"commit": commit, "time": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(), "qt": QT_VERSION_STR, "numpy": np.__version__,
+            "platform": platform.platform(), "qpa": os.environ.get("QT_QPA_PLATFORM")}
+
+
+def flatten(results, prefix=""):
+    """{"graph": {"1000": {"plot_graph": {"mean_ms": 1}}}} -> {"graph.1000.plot_graph.mean_ms": 1}"""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(baseline, current):
+    """Prints the headline metrics side by side; for *_ms lower is better, for *_per_s higher is"""
+    old, new = flatten(baseline["results"]), flatten(current["results"])
+    print(f"\nAgainst {baseline['meta'].get('commit')} ({baseline['meta'].get('time')}):")
+    for name in sorted(new):
+        if name not in old or not old[name] or not name.endswith(("mean_ms", "p95_ms", "_per_s")):
+            continue
+        change = new[name] / old[name] - 1
+        worse = change > 0.1 if name.endswith("_ms") else change < -0.1
+        print(f"  {name:<48}{old[name]:12.3f}{new[name]:12.3f}  {change:+7.1%}{'  REGRESSION' if worse else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless GUI/telemetry benchmark suite")
+    parser.add_argument("--only", nargs="+", choices=list(CASES), help="Run just these cases")
+    parser.add_argument("--quick", action="store_true", help="Fewer repetitions, for a smoke check")
+    parser.add_argument("--output", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = {}
+    for name in args.only or CASES:
+        print(f"Running {name}...")
+        try:
+            results[name] = CASES[name](args.quick)
+        except Exception as e:
+            # Record the failure instead of dropping the case, so a broken path shows up in the file
+            print(f"  {name} failed: {e!r}")
+            results[name] = {"error": repr(e)}
+
+    report = {"meta": metadata(), "quick": args.quick, "results": results}
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text()), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+from collections import deque
+import math
+import numpy as np
+from controllers.telemetry_packet import RESTART_GAP
+
+
+def from_euler(pitch, yaw, roll):
+    """Unit quaternion (w, x, y, z) for roll about Z, then pitch about Y, then yaw about X (degrees)"""
+    def axis_angle(angle, axis):
+        half = math.radians(angle) / 2
+        q = np.zeros(4)
+        q[0] = math.cos(half)
+        q[axis] = math.sin(half)
+        return q
+    return multiply(multiply(axis_angle(yaw, 1), axis_angle(pitch, 2)), axis_angle(roll, 3))
+
+
+def multiply(a, b):
+    w1, x1, y1, z1 = a
+    w2, x2, y2, z2 = b
+    return np.array((w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+                     w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+                     w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+                     w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2))
+
+
+def slerp(a, b, t):
+    """Constant-speed interpolation along the shorter arc from a (t=0) to b (t=1)"""
+    dot = float(np.dot(a, b))
+    if dot < 0:  # q and -q are the same attitude, take the short way round
+        b, dot = -b, -dot
+    if dot > 0.9995:  # Nearly identical, a normalised lerp is exact enough
+        q = a + (b - a) * t
+        return q / np.linalg.norm(q)
+    theta = math.acos(dot)
+    return (math.sin((1 - t) * theta) * a + math.sin(t * theta) * b) / math.sin(theta)
+
+
+class AttitudeBuffer:
+    """Short history of timestamped attitudes, sampled at an arbitrary display time.
+
+    Samples arrive in irregular bursts, so the display runs `delay` seconds behind the newest
+    sample and interpolates between the two samples around it instead of jumping on arrival.
+    Sample timestamps are mapped to local time through the smallest transit delay seen so far.
+    """
+
+    def __init__(self, delay=0.1, size=64):
+        self.delay = delay
+        self.samples = deque(maxlen=size)  # (sample time, quaternion), oldest first
+        self.offset = None  # Local time minus sample time for the least delayed sample
+
+    def add(self, q, timestamp, arrival):
+        if self.samples and timestamp < self.samples[-1][0] - RESTART_GAP:
+            # Device clock started over (restart, replay rewind); the old samples and offset don't apply
+            self.samples.clear()
+            self.offset = None
+        offset = arrival - timestamp
+        if self.offset is None or offset < self.offset:
+            self.offset = offset
+        else:
+            self.offset += (offset - self.offset) * 0.01  # Follow slow clock drift
+        if self.samples and timestamp <= self.samples[-1][0]:
+            return  # Late or repeated sample, the display has moved past it
+        self.samples.append((timestamp, q))
+
+    def at(self, now):
+        """Attitude to show at local time now, and whether it will still change after now"""
+        if not self.samples:
+            return None, False
+        t = now - self.offset - self.delay
+        newest_time, newest = self.samples[-1]
+        if t >= newest_time:
+            return newest, False
+        oldest_time, oldest = self.samples[0]
+        if t <= oldest_time:
+            return oldest, True
+        samples = list(self.samples)
+        for i in range(len(samples) - 1, 0, -1):  # Newest pairs first, t is usually near the end
+            t0, q0 = samples[i - 1]
+            if t0 <= t:
+                t1, q1 = samples[i]
+                return slerp(q0, q1, (t - t0) / (t1 - t0)), True
+        return oldest, True
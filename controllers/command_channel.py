@@ -0,0 +1,122 @@
+import asyncio, socket, threading
+from collections import deque
+import time
+import numpy as np
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class CommandChannel(QObject):
+    """One long-lived TCP link to the ESP32 for commands, running on the NetworkEngine loop.
+
+    Commands are queued and numbered; the firmware answers every command with one line, in order,
+    so replies are matched to commands first-in first-out and timed on arrival. Every command gets
+    exactly one reply_received or command_failed. Commands are never held for a later reconnect:
+    a late valve command is worse than a failed one.
+    """
+    reply_received = pyqtSignal(int, str, float)  # seq, reply line, round trip in ms
+    command_failed = pyqtSignal(int, str)  # seq, command (link down, or lost before a reply)
+    connection_changed = pyqtSignal(bool)
+
+    def __init__(self, ip, port, reconnect_delay=1.0, connect_timeout=2.0):
+        super().__init__()
+        self.ip = ip
+        self.port = port
+        self.reconnect_delay = reconnect_delay
+        self.connect_timeout = connect_timeout
+
+        self.engine = None
+        self.send_queue = None
+        self.connected = False
+        self.pending = deque()  # (seq, command, send time) waiting for a reply, loop thread only
+        self.seq_lock = threading.Lock()
+        self.next_seq = 0
+        self.latencies = deque(maxlen=1000)  # Recent round trips in ms
+
+    def start(self, engine):
+        """Runs the link on the engine's loop until the engine stops"""
+        self.engine = engine
+        self.send_queue = asyncio.Queue()
+        engine.start_task(self.run())
+
+    def send(self, command):
+        """Queues a command from any thread and returns its sequence ID. Fails at once while the link is down"""
+        if not self.engine or not self.engine.running:
+            return None
+        with self.seq_lock:
+            seq = self.next_seq
+            self.next_seq += 1
+        if not self.connected:
+            self.command_failed.emit(seq, command)
+            return seq
+        self.engine.call_soon(self.enqueue, seq, command)
+        return seq
+
+    def enqueue(self, seq, command):
+        """Loop thread: the link may have dropped since send() checked it"""
+        if self.connected:
+            self.send_queue.put_nowait((seq, command))
+        else:
+            self.command_failed.emit(seq, command)
+
+    async def run(self):
+        """Keeps the link up and reads replies; reconnects after any failure"""
+        while True:
+            try:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(self.ip, self.port),
+                                                        self.connect_timeout)
+            except (OSError, asyncio.TimeoutError) as e:
+                print(f"Command link error: {e!r}")
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+
+            writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.set_connected(True)
+            sender = asyncio.create_task(self.send_loop(writer))
+            try:
+                while line := await reader.readline():
+                    self.match_reply(line.decode(errors="replace").strip())
+            except OSError as e:
+                print(f"Command link error: {e}")
+            finally:
+                sender.cancel()
+                writer.close()
+                self.set_connected(False)  # First, so send() stops queueing
+                self.fail_pending()
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def send_loop(self, writer):
+        """Writes queued commands while the link is up"""
+        while True:
+            seq, command = await self.send_queue.get()
+            self.pending.append((seq, command, time.perf_counter()))
+            writer.write(f"{command}\n".encode())
+            await writer.drain()
+
+    def match_reply(self, reply):
+        if not self.pending:
+            return  # Unsolicited line
+        seq, command, sent = self.pending.popleft()
+        latency = (time.perf_counter() - sent) * 1000
+        self.latencies.append(latency)
+        self.reply_received.emit(seq, reply, latency)
+
+    def fail_pending(self):
+        """Fails everything sent without a reply and everything still queued (loop thread)"""
+        failed, self.pending = self.pending, deque()
+        for seq, command, _ in failed:
+            self.command_failed.emit(seq, command)
+        while not self.send_queue.empty():
+            seq, command = self.send_queue.get_nowait()
+            self.command_failed.emit(seq, command)
+
+    def set_connected(self, connected):
+        self.connected = connected
+        self.connection_changed.emit(connected)
+
+    def latency_stats(self):
+        """Round-trip statistics in ms over the recent commands"""
+        if not self.latencies:
+            return {"count": 0}
+        samples = np.fromiter(self.latencies, dtype=float)
+        return {"count": len(samples), "last": samples[-1], "mean": samples.mean(),
+                "p50": np.percentile(samples, 50), "p95": np.percentile(samples, 95), "max": samples.max()}
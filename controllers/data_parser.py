@@ -1,25 +1,53 @@
 from PyQt6.QtCore import pyqtSignal, QObject
+from misc.file_handler import load_file
 
 
 class DataEmitter(QObject):
-    """Class to emit PyQt Signals for parsed data"""
+    """Class to emit PyQt Signals for parsed data.
 
+    Every channel a message can carry is looked up in one dispatch table built at startup from
+    config.json, so a message only ever touches the keys it actually holds. Extra consumers can
+    be registered per channel at runtime.
+    """
+    # Grouped messages
+    valve_state_S = pyqtSignal(object)  # "VALVES": every valve state at once
+    sensor_readings_S = pyqtSignal(object)  # "SENSOR": every sensor reading at once
+    test_data_S = pyqtSignal(object)  # "TEST"
+    warning_message_S = pyqtSignal(str)  # "WARNING"
+    # Single named channels from config.json
+    sensor_reading_S = pyqtSignal(str, object)  # Sensor name, reading(s)
+    valve_changed_S = pyqtSignal(str, object)  # Valve name, state
 
-    def __init__(self):
+    def __init__(self, config=None):
         super().__init__()
+        config = config if config else load_file("data/config.json")
+        self.table = {}  # Channel -> tuple of callables, copied on write like the router's
+
+        self.register("VALVES", self.valve_state_S.emit)
+        self.register("SENSOR", self.sensor_readings_S.emit)
+        self.register("TEST", self.test_data_S.emit)
+        self.register("WARNING", lambda message: self.warning_message_S.emit(str(message)))
+        for sensor in config.get("SENSORS", []):
+            self.register(sensor, lambda value, name=sensor: self.sensor_reading_S.emit(name, value))
+        for valve in config.get("VALVES", []):
+            self.register(valve, lambda state, name=valve: self.valve_changed_S.emit(name, state))
+
+    def register(self, channel, callback):
+        """Calls callback(value) whenever a message carries channel. Returns a handle for unregister"""
+        entry = (channel, callback)
+        self.table[channel] = self.table.get(channel, ()) + (entry,)
+        return entry
+
+    def unregister(self, handle):
+        channel = handle[0]
+        remaining = tuple(entry for entry in self.table.get(channel, ()) if entry is not handle)
+        if remaining:
+            self.table[channel] = remaining
+        else:
+            self.table.pop(channel, None)
 
     def separator(self, message):
         """Parses data into usable commands/info"""
-        # List of available options
-        signal_map = {
-            "VALVES": self.valve_state_S,
-            "SENSOR": self.sensor_readings_S,
-            "TEST": self.test_data_S,
-            "WARNING": self.warning_message_S,
-        }
-
-        # Circulate through your options
-        for key, signal in signal_map.items():
-            if key in message:
-                signal.emit(message[key])
-
+        for key in message:
+            for _, callback in self.table.get(key, ()):
+                callback(message[key])
@@ -0,0 +1,39 @@
+import numpy as np
+
+
+def run_min_max(x, y, run):
+    """Min and max point of every complete run of `run` samples, each pair in time order.
+
+    y may hold one channel per row, reduced along the last axis; x is then either the shared
+    time column or one row of times per channel.
+    """
+    rows = y.shape[:-1]
+    full = y.shape[-1] // run * run
+    runs = y[..., :full].reshape(*rows, -1, run)
+    starts = np.arange(0, full, run)
+    lows = runs.argmin(axis=-1) + starts
+    highs = runs.argmax(axis=-1) + starts
+    index = np.sort(np.stack((lows, highs), axis=-1), axis=-1).reshape(*rows, -1)
+    x_out = x[index] if x.ndim == 1 else np.take_along_axis(x, index, axis=-1)
+    return x_out, np.take_along_axis(y, index, axis=-1)
+
+
+def min_max(x, y, columns):
+    """Reduces a trace to the min and max of each pixel column, in time order.
+
+    Samples are bucketed into `columns` equal runs (telemetry is evenly sampled, so a run is a
+    column's worth of time) and only each run's lowest and highest point is kept. Spikes survive
+    however narrow they are, and at most ~2 * columns points reach the renderer.
+    """
+    count = len(y)
+    columns = max(1, int(columns))
+    if count <= 2 * columns:
+        return x, y
+
+    run = -(-count // columns)  # Ceiling division
+    full = count // run * run
+    x_out, y_out = run_min_max(x, y, run)
+    if full < count:  # Partial last run
+        tail = np.sort([full + y[full:].argmin(), full + y[full:].argmax()])
+        x_out, y_out = np.concatenate((x_out, x[tail])), np.concatenate((y_out, y[tail]))
+    return x_out, y_out
@@ -3,14 +3,27 @@ from PyQt6.QtCore import Qt, QMutex, QTimer
 from PyQt6.QtGui import QColor
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+import math
+import numpy as np
+from controllers import decimation
+from controllers.telemetry_store import TelemetryStore
+
+
+def create_graph(backend="matplotlib", **kwargs):
+    """Builds a strip chart with the plotting backend chosen in config.json (GRAPH_BACKEND)"""
+    if backend == "pyqtgraph":
+        from controllers.pg_graph_controller import PgGraphWidget
+        return PgGraphWidget(**kwargs)
+    return GraphWidget(**kwargs)
 
 class GraphWidget(QWidget):
-    def __init__(self, data_controller, title=None, x_lab=None, y_lab=None, parent=None, bg_color='#242424', x=None,
+    def __init__(self, router, title=None, x_lab=None, y_lab=None, parent=None, bg_color='#242424', x=None,
                  y=None,
-                 time_window=10):
+                 time_window=10, sample_rate=10, render_clock=None, store=None):
         super().__init__(parent)
-        self.data_controller = data_controller
+        self.router = router
+        self.render_clock = render_clock
         self.setMaximumHeight(200)
         self.mutex = QMutex()  # Mutex to prevent data race conditions
         self.resizing = False  # Track if resizing is happening
@@ -18,10 +31,8 @@ class GraphWidget(QWidget):
         self.resize_timer.setSingleShot(True)
         self.resize_timer.timeout.connect(self.finish_resize)
 
-        if self.data_controller:
-            self.data_controller.data_signal.connect(self.handle_new_data, type=Qt.ConnectionType.QueuedConnection)
-
-        self.figure, self.ax = plt.subplots()
+        self.figure = Figure()  # Embedded directly, pyplot's global figure registry isn't needed
+        self.ax = self.figure.add_subplot()
         self.canvas = FigureCanvas(self.figure)
         self.toolbar = NavigationToolbar(self.canvas, self)  # Compact toolbar
         self.toolbar.setFixedHeight(20)
@@ -46,19 +57,29 @@ class GraphWidget(QWidget):
         layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.setLayout(layout)
 
-        self.x_data = x if x else []
-        self.y_data = y if y else []
+        # Samples live in the shared store (filled by the router); standalone graphs get their own
+        self.own_store = store is None
+        self.store = store if store is not None else TelemetryStore.for_window([y_lab], time_window, sample_rate,
+                                                                             time_key=x_lab)
+        if x and y and self.own_store:
+            self.store.append({x_lab: x, y_lab: y})
         self.title = title
         self.x_l = x_lab
         self.y_l = y_lab
         self.time_window = time_window
+        self.scroll_step = 0.1  # Fraction of the window the x-axis jumps ahead by
+        self.bg_color = bg_color
         self.manual_scroll = False
 
         self.canvas.mpl_connect("button_press_event", self.on_mouse_press)
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self.show_context_menu)
 
-        self.plot_graph()
+        self.setup_axes()
+        # No draw yet: the first full draw happens once the widget has been laid out (finish_resize)
+
+        if self.router:
+            self.router.subscribe((self.x_l, self.y_l), self.update_data)
 
     def resizeEvent(self, event):
         """Track resize events and delay plot update to prevent UI lag."""
@@ -69,6 +90,7 @@ class GraphWidget(QWidget):
     def finish_resize(self):
         """Called after resizing finishes to redraw the graph without lag."""
         self.resizing = False
+        self.background = None  # Forces a relayout at the new size
         self.plot_graph()
 
     def show_context_menu(self, pos):
@@ -78,45 +100,125 @@ class GraphWidget(QWidget):
         if action == toggle_toolbar_action:
             self.toolbar.setVisible(not self.toolbar.isVisible())
 
-    def handle_new_data(self, data):
-        if self.x_l in data and self.y_l in data:
-            self.update_data(data[self.x_l], data[self.y_l])
-
     def on_mouse_press(self, event):
         if event.button == 1:
             self.manual_scroll = True
 
-    def plot_graph(self):
-        if self.resizing:
-            return  # Skip updating while resizing to prevent stutter
-
-        self.mutex.lock()
-        self.ax.clear()
-        self.ax.set_facecolor('#242424')
-        if self.x_data and self.y_data:
-            self.ax.plot(self.x_data, self.y_data, linestyle='-', color='yellow', linewidth=0.5)
-            if not self.manual_scroll:
-                latest_time = self.x_data[-1]
-                start_time = max(0, latest_time - self.time_window)
-                self.ax.set_xlim(start_time - 1, latest_time)
-
+    def setup_axes(self):
+        """Builds the static parts of the plot once; only the line changes per frame"""
+        self.ax.set_facecolor(self.bg_color)
         self.ax.set_title(f"{self.title}", color='white', fontsize=7)
         self.ax.set_xlabel(f"{self.x_l}", color='white', fontsize=6)
         self.ax.set_ylabel(f"{self.y_l}", color='white', fontsize=6)
         self.ax.tick_params(colors='white', labelsize=5)
 
+        # Animated artists are skipped by full draws and painted on top of the cached background
+        self.line, = self.ax.plot([], [], linestyle='-', color='yellow', linewidth=0.5, animated=True)
+        self.background = None
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+
+    def on_draw(self, event):
+        """Caches the static background after every full draw (resize, zoom, limit jump)"""
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.line)
+        if self.manual_scroll:
+            # A pan or zoom may need a different history level, redraw the line for it
+            if self.render_clock:
+                self.render_clock.mark_dirty(self)
+            else:
+                QTimer.singleShot(0, self.plot_graph)
+
+    def update_limits(self, x, y):
+        """Moves the axis limits only when the data leaves them. Returns True if they jumped"""
+        jumped = False
+        if not self.manual_scroll:
+            latest_time = x[-1]
+            left, right = self.ax.get_xlim()
+            if latest_time > right or latest_time < left:
+                # Scroll ahead a step at a time so most frames can be blitted
+                start_time = max(0, latest_time - self.time_window)
+                self.ax.set_xlim(start_time - 1, latest_time + self.time_window * self.scroll_step)
+                jumped = True
+
+            y_min, y_max = float(y.min()), float(y.max())
+            if math.isnan(y_min):  # Samples from a source that doesn't send this channel
+                y = y[~np.isnan(y)]
+                if not len(y):
+                    return jumped
+                y_min, y_max = float(y.min()), float(y.max())
+            bottom, top = self.ax.get_ylim()
+            span = max(y_max - y_min, 1e-6)
+            # Refit when the data escapes the axis or shrinks to a sliver of it
+            if y_min < bottom or y_max > top or span < (top - bottom) * 0.25:
+                margin = span * 0.1
+                self.ax.set_ylim(y_min - margin, y_max + margin)
+                jumped = True
+        return jumped
+
+    def full_draw(self):
+        """Relayout and redraw everything, refreshing the cached background"""
         self.figure.tight_layout(pad=0)
         self.canvas.draw()
+
+    def plot_graph(self):
+        if self.resizing:
+            return  # Skip updating while resizing to prevent stutter
+
+        self.mutex.lock()
+        latest = self.store.latest()
+        relayout = self.background is None
+        if latest is None:
+            x = y = np.empty(0)
+        else:
+            # Zero-copy slice of the shared columns, just what the scrolling window can show
+            x, y = self.store.window(self.y_l, latest - self.time_window * (1 + self.scroll_step) - 1)
+            relayout = self.update_limits(x, y) or relayout
+            if self.manual_scroll:
+                x, y = self.visible_level()
+        # No more than two points per pixel column reach the renderer, whatever the sample rate
+        self.line.set_data(*decimation.min_max(x, y, self.ax.bbox.width))
+
+        if relayout:
+            self.full_draw()
+        else:
+            # Fast path: restore the cached axes and repaint the line only
+            self.canvas.restore_region(self.background)
+            self.ax.draw_artist(self.line)
+            self.canvas.blit(self.ax.bbox)
         self.mutex.unlock()
 
+    def visible_level(self):
+        """Slice of the finest history level that covers the visible range in a drawable number of points"""
+        left, right = self.ax.get_xlim()
+        budget = 8 * self.ax.bbox.width
+        visible = np.empty(0), np.empty(0)
+        for level_x, level_y in self.store.history(self.y_l):
+            if not len(level_x):
+                break  # Coarser levels fill later still
+            # On screen plus a point either side
+            start = max(0, int(np.searchsorted(level_x, left)) - 1)
+            end = int(np.searchsorted(level_x, right)) + 1
+            visible = level_x[start:end], level_y[start:end]
+            if level_x[0] <= left and end - start <= budget:
+                break
+        return visible
+
+    def render_frame(self):
+        """Called by the render clock once per frame while this graph has new data"""
+        self.plot_graph()
+
     def update_data(self, x_data, y_data):
         self.mutex.lock()
-        self.x_data.extend(x_data)
-        self.y_data.extend(y_data)
+        if self.own_store:
+            self.store.append({self.x_l: x_data, self.y_l: y_data})
+        # A shared store already holds this packet, the call only means there is something new
         if self.manual_scroll:
-            latest_time = self.x_data[-1]
+            latest_time = self.store.latest()
             current_xlim = self.ax.get_xlim()
-            if latest_time > current_xlim[1]:
+            if latest_time is not None and latest_time > current_xlim[1]:
                 self.manual_scroll = False
         self.mutex.unlock()
-        self.plot_graph()
+        if self.render_clock:
+            self.render_clock.mark_dirty(self)  # Painted on the next tick, not per sample
+        else:
+            self.plot_graph()
@@ -0,0 +1,194 @@
+"""Optional out-of-process telemetry ingestion (config.json INGEST_PROCESS).
+
+A child process owns the UDP socket. It drains the socket, records the raw batches and decodes
+them, then writes the frames into a multiprocessing.shared_memory ring. Nothing in it waits on
+the GUI, so a redraw can hold the GIL in the GUI process for a second or more and the socket is
+still read at full rate. The GUI takes whatever is new out of the ring once per rendered frame.
+
+Ring layout in the shared block:
+
+    header     RING_HEADER, padded to HEADER_SIZE bytes
+    frames     capacity x PACKET_DTYPE, decoded frames
+    received   capacity x float64, perf_counter time each frame's batch came off the socket
+
+There is one writer and one reader. The writer fills the slots first and then publishes the new
+"written" total, so the reader never sees a half-written frame. A reader that falls a whole ring
+behind skips ahead and counts what it lost. perf_counter is a system-wide monotonic clock, so
+receive times can be compared across the two processes.
+
+This module doesn't import Qt, so the spawned child starts quickly.
+"""
+import multiprocessing
+import socket
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from controllers import telemetry_packet
+
+RING_HEADER = np.dtype([("written", "<u8"), ("batches", "<u8"), ("datagrams", "<u8"), ("rejected", "<u8")])
+HEADER_SIZE = 64
+
+
+class SharedRing:
+    """Decoded frames in shared memory. Creates the block without a name, attaches with one"""
+
+    def __init__(self, capacity, name=None, dtype=telemetry_packet.PACKET_DTYPE):
+        self.capacity = int(capacity)
+        size = HEADER_SIZE + self.capacity * (dtype.itemsize + 8)
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+        buffer = self.shm.buf
+        self.header = np.ndarray((), dtype=RING_HEADER, buffer=buffer)
+        self.frames = np.ndarray(self.capacity, dtype=dtype, buffer=buffer, offset=HEADER_SIZE)
+        self.received = np.ndarray(self.capacity, dtype=np.float64, buffer=buffer,
+                                   offset=HEADER_SIZE + self.capacity * dtype.itemsize)
+        if name is None:
+            self.header[()] = 0
+        self.read_count = 0  # Reader side: frames consumed so far
+        self.read_batches = 0  # Reader side: batches published as of the last read
+        self.lost = 0  # Reader side: frames overwritten before they were read
+
+    def write(self, records, received):
+        """Writer side: appends decoded frames, all read off the socket at `received`"""
+        written = int(self.header["written"])
+        count = len(records)
+        if count > self.capacity:
+            records = records[-self.capacity:]  # Only the newest fit, they go where they would have landed
+        size = len(records)
+        first = (written + count - size) % self.capacity
+        end = min(first + size, self.capacity)
+        self.frames[first:end] = records[:end - first]
+        self.received[first:end] = received
+        if size > end - first:
+            self.frames[:size - (end - first)] = records[end - first:]
+            self.received[:size - (end - first)] = received
+        self.header["written"] = written + count  # Publish only once the slots hold the frames
+        self.header["batches"] += 1
+
+    def unread(self):
+        """Batches published since the last read"""
+        return int(self.header["batches"]) - self.read_batches
+
+    def read(self):
+        """Reader side: copies of every frame written since the last read, and their receive times"""
+        self.read_batches = int(self.header["batches"])
+        written = int(self.header["written"])
+        start = max(self.read_count, written - self.capacity)
+        self.lost += start - self.read_count
+        if start == written:
+            return None, None
+        index = np.arange(start, written) % self.capacity
+        frames = self.frames[index]
+        received = self.received[index]
+
+        # The writer may have lapped the oldest of these while they were being copied
+        overwritten = int(self.header["written"]) - self.capacity - start
+        if overwritten > 0:
+            frames, received = frames[overwritten:], received[overwritten:]
+            self.lost += overwritten
+        self.read_count = written
+        return frames, received
+
+    def stats(self):
+        return {name: int(self.header[name]) for name in RING_HEADER.names} | {"lost": self.lost}
+
+    def close(self, unlink=False):
+        # The numpy views hold the buffer, they have to go before the block can close
+        self.header = self.frames = self.received = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def ingest_main(ring_name, capacity, udp_port, stop, session=None, segment_size=64 * 1024 * 1024,
+                batch_budget=512):
+    """Child process: socket -> recorder + decode -> shared ring, until stop is set"""
+    ring = SharedRing(capacity, name=ring_name)
+    recorder = None
+    if session:
+        from controllers.recorder import TelemetryRecorder
+        recorder = TelemetryRecorder(session=session, segment_size=segment_size)
+        recorder.start()
+
+    udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    udp_socket.bind(("0.0.0.0", udp_port))
+    receive_buffer = bytearray(batch_budget * telemetry_packet.MAX_DATAGRAM)
+    view = memoryview(receive_buffer)
+    try:
+        while not stop.is_set():
+            # Block for the first datagram (waking now and then to check stop), then drain the rest
+            udp_socket.settimeout(0.1)
+            try:
+                size = udp_socket.recv_into(view[:telemetry_packet.MAX_DATAGRAM])
+            except socket.timeout:
+                continue
+            received = time.perf_counter()
+            udp_socket.setblocking(False)
+            filled = 0
+            count = 0
+            while True:
+                count += 1
+                if size and size % telemetry_packet.PACKET_SIZE == 0:
+                    filled += size  # Keep only whole frames so the batch stays aligned
+                else:
+                    ring.header["rejected"] += 1
+                if count >= batch_budget:
+                    break
+                try:
+                    size = udp_socket.recv_into(view[filled:filled + telemetry_packet.MAX_DATAGRAM])
+                except OSError:  # Socket empty
+                    break
+            ring.header["datagrams"] += count
+
+            if filled:
+                payload = bytes(view[:filled])
+                if recorder:
+                    recorder.append(time.time_ns(), payload)
+                records = telemetry_packet.decode(payload)
+                if len(records):
+                    ring.write(records, received)
+    except KeyboardInterrupt:
+        pass  # Ctrl+C reaches the whole process group, the GUI shuts this down itself
+    finally:
+        udp_socket.close()
+        if recorder:
+            recorder.stop()
+        ring.close()
+
+
+class IngestProcess:
+    """GUI-side handle: starts the child, then read() returns what it decoded since the last call"""
+
+    def __init__(self, udp_port, capacity=2 ** 18, session=None, segment_size=64 * 1024 * 1024):
+        self.ring = SharedRing(capacity)
+        # Spawned rather than forked: the GUI process already runs Qt and network threads
+        context = multiprocessing.get_context("spawn")
+        self.stop_event = context.Event()
+        self.process = context.Process(target=ingest_main, name="telemetry-ingest", daemon=True,
+                                       args=(self.ring.shm.name, capacity, udp_port, self.stop_event,
+                                             session, segment_size))
+
+    def start(self):
+        self.process.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.process.close()
+        self.ring.close(unlink=True)
+
+    def backlog(self):
+        """Batches decoded by the child but not read yet"""
+        return self.ring.unread()
+
+    def read(self):
+        """New frames as a router packet (see telemetry_packet.to_channels), or None"""
+        records, received = self.ring.read()
+        if records is None:
+            return None
+        data = telemetry_packet.to_channels(records)
+        data["_received"] = float(received[0])  # Latency counts from the oldest frame in the batch
+        return data
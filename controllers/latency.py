@@ -0,0 +1,122 @@
+from collections import deque
+import time
+import numpy as np
+from PyQt6.QtCore import QObject, QTimer, Qt, pyqtSignal
+from PyQt6.QtWidgets import QLabel
+
+# Every stage is measured from the moment the batch came off the socket (time.perf_counter)
+STAGES = ("dispatch", "ingest", "paint")
+
+
+class LatencyTracker(QObject):
+    """Collects how stale data is at each stage between the socket and the painted frame.
+
+    DataController stamps dispatch, the router stamps ingestion once widgets have the data, and
+    the render clock reports when the frame showing it has been painted. Once a second the
+    distributions are summarised and checked against behind_ms so lag is reported, not hidden.
+    """
+    updated = pyqtSignal(dict)  # Latest summary, once a second
+    behind_changed = pyqtSignal(bool, str)  # Pipeline started/stopped falling behind, with reason
+
+    def __init__(self, size=4096, behind_ms=250.0, max_backlog=50):
+        super().__init__()
+        self.samples = {stage: deque(maxlen=size) for stage in STAGES}  # ms
+        self.recent = {stage: [] for stage in STAGES}  # ms, since the last check
+        self.unpainted = []  # Receive stamps ingested since the last painted frame
+        self.behind_ms = behind_ms
+        self.max_backlog = max_backlog
+        self.behind = False
+        self.backlog = None  # Optional callable giving batches still queued upstream
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.check)
+        self.timer.start(1000)
+
+    def stamp(self, stage, received):
+        latency = (time.perf_counter() - received) * 1000
+        self.samples[stage].append(latency)
+        self.recent[stage].append(latency)
+
+    def ingested(self, received):
+        """Data is in the widgets; it counts as shown once the next frame is painted"""
+        self.stamp("ingest", received)
+        self.unpainted.append(received)
+
+    def frame_painted(self):
+        if not self.unpainted:
+            return
+        now = time.perf_counter()
+        painted = [(now - received) * 1000 for received in self.unpainted]
+        self.samples["paint"].extend(painted)
+        self.recent["paint"].extend(painted)
+        self.unpainted.clear()
+
+    def summary(self):
+        """p50/p95/p99/max in ms per stage"""
+        result = {}
+        for stage, values in self.samples.items():
+            if not values:
+                result[stage] = {"count": 0}
+                continue
+            samples = np.fromiter(list(values), dtype=float)
+            p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+            result[stage] = {"count": len(samples), "p50": p50, "p95": p95, "p99": p99, "max": samples.max()}
+        return result
+
+    def check(self):
+        summary = self.summary()
+        reasons = []
+        # Judged on the last second only, so a slow start doesn't count against it for minutes
+        for stage in ("paint", "ingest"):
+            if self.recent[stage]:
+                p95 = np.percentile(self.recent[stage], 95)
+                if p95 > self.behind_ms:
+                    reasons.append(f"{stage} p95 {p95:.0f} ms")
+                    break
+        for values in self.recent.values():
+            values.clear()
+        backlog = self.backlog() if self.backlog else 0
+        if backlog > self.max_backlog:
+            reasons.append(f"{backlog} batches queued")
+        summary["backlog"] = backlog
+
+        behind = bool(reasons)
+        if behind != self.behind:
+            self.behind = behind
+            reason = ", ".join(reasons) if reasons else "caught up"
+            print(f"Telemetry pipeline {'FALLING BEHIND' if behind else 'recovered'}: {reason}")
+            self.behind_changed.emit(behind, reason)
+        summary["behind"] = behind
+        self.updated.emit(summary)
+
+
+class LatencyOverlay(QLabel):
+    """Small always-on-top readout of the latency distributions"""
+
+    def __init__(self, tracker, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.color = None
+        tracker.updated.connect(self.show_summary)
+
+    def show_summary(self, summary):
+        lines = ["latency ms    p50    p95    p99    max"]
+        for stage in STAGES:
+            values = summary[stage]
+            if values["count"]:
+                lines.append(f"{stage:<10}{values['p50']:7.1f}{values['p95']:7.1f}"
+                             f"{values['p99']:7.1f}{values['max']:7.1f}")
+            else:
+                lines.append(f"{stage:<10}{'-':>7}")
+        if summary["behind"]:
+            lines.append(f"FALLING BEHIND ({summary['backlog']} queued)")
+        self.setText("\n".join(lines))
+        color = "#ff5050" if summary["behind"] else "white"
+        if color != self.color:  # Restyle only when the state flips
+            self.color = color
+            self.setStyleSheet(f"background-color: rgba(0, 0, 0, 160); color: {color}; font-family: monospace;"
+                               "font-size: 9pt;")
+        self.adjustSize()
+        if self.parentWidget():
+            self.move(self.parentWidget().width() - self.width() - 10, 30)
+        self.raise_()
@@ -0,0 +1,105 @@
+"""Prepared, cached meshes for the 3D model view.
+
+An STL stores every triangle corner separately, so parsing it gives three unshared vertices per
+triangle. prepare() merges identical corners into an indexed mesh and builds coarser levels of
+detail by vertex clustering. The result is cached as an .npz named after the STL's content hash,
+so the parse only happens again when the STL itself changes.
+"""
+import hashlib
+import os
+import numpy as np
+from misc.file_handler import get_file_path
+
+CACHE_DIR = "data/mesh_cache"
+LOD_GRID = (96, 48, 24)  # Clustering cells along the longest side for each reduced level
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def deduplicate(corners):
+    """Triangle corners (n, 3, 3) -> shared vertices and the faces indexing them"""
+    vertices, inverse = np.unique(corners.reshape(-1, 3), axis=0, return_inverse=True)
+    faces = inverse.reshape(-1, 3)
+    return vertices.astype(np.float32), drop_degenerate(faces).astype(np.int32)
+
+
+def drop_degenerate(faces):
+    """Removes triangles that collapsed to a line or point, and repeats of the same triangle"""
+    faces = faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])]
+    # Same corners in any order are the same triangle; keep the first winding seen
+    _, first = np.unique(np.sort(faces, axis=1), axis=0, return_index=True)
+    return faces[np.sort(first)]
+
+
+def cluster(vertices, faces, cells):
+    """Lower level of detail: vertices in the same grid cell merge into their mean"""
+    low, high = vertices.min(axis=0), vertices.max(axis=0)
+    size = max(float((high - low).max()), 1e-9) / cells
+    keys = np.floor((vertices - low) / size).astype(np.int64)
+    _, cell_of, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+    cell_of = cell_of.ravel()
+    merged = np.zeros((len(counts), 3))
+    np.add.at(merged, cell_of, vertices)
+    merged /= counts[:, None]
+
+    faces = drop_degenerate(cell_of[faces])
+    used, faces = np.unique(faces, return_inverse=True)  # Drop cells no face uses any more
+    return merged[used].astype(np.float32), faces.reshape(-1, 3).astype(np.int32)
+
+
+def prepare(path):
+    """Parses an STL into [(vertices, faces), ...], full detail first then each LOD_GRID level"""
+    from stl import mesh  # Only needed on a cache miss
+    vertices, faces = deduplicate(mesh.Mesh.from_file(str(path)).vectors)
+    levels = [(vertices, faces)]
+    for cells in LOD_GRID:
+        reduced = cluster(vertices, faces, cells)
+        if len(reduced[1]) < len(levels[-1][1]):  # Only keep levels that actually save something
+            levels.append(reduced)
+    return levels
+
+
+def load_levels(filename):
+    """Prepared levels for an STL, from the cache when the file hasn't changed"""
+    path = get_file_path(filename)
+    cache = get_file_path(CACHE_DIR) / f"{path.stem}-{file_hash(path)[:16]}.npz"
+    try:
+        with np.load(cache) as stored:
+            return [(stored[f"vertices_{i}"], stored[f"faces_{i}"]) for i in range(int(stored["levels"]))]
+    except Exception:  # Missing, truncated or from an older layout: any of it just means a rebuild
+        pass
+
+    levels = prepare(path)
+    try:
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {"levels": len(levels)}
+        for i, (vertices, faces) in enumerate(levels):
+            arrays[f"vertices_{i}"] = vertices
+            arrays[f"faces_{i}"] = faces
+        # Written beside the cache and moved into place, so a crash mid-write never leaves a partial file
+        partial = cache.with_name(f"{cache.name}.{os.getpid()}.tmp")
+        try:
+            with open(partial, "wb") as file:
+                np.savez(file, **arrays)
+            os.replace(partial, cache)
+        finally:
+            partial.unlink(missing_ok=True)
+    except OSError as e:
+        print(f"Mesh cache not written: {e}")
+    return levels
+
+
+def load_mesh(filename, max_faces=None):
+    """Vertices and faces of the most detailed level with at most max_faces triangles"""
+    levels = load_levels(filename)
+    if max_faces:
+        for vertices, faces in levels:
+            if len(faces) <= max_faces:
+                return vertices, faces
+    return levels[-1] if max_faces else levels[0]
@@ -1,16 +1,17 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QSlider
-from PyQt6.QtCore import QTimer, Qt, QPointF
-from PyQt6.QtGui import QPainter, QBrush, QColor, QTransform, QPixmap
-import pyqtgraph.opengl as gl
+from PyQt6.QtCore import QTimer, Qt, QPointF, QRectF
+from PyQt6.QtGui import QPainter, QBrush, QColor, QTransform, QPixmap, QQuaternion
 import time
+from collections import OrderedDict
 import numpy as np
-from stl import mesh
-from pyqtgraph import Transform3D
+from controllers.render_clock import RenderClock
+from controllers import mesh_cache
+from controllers.attitude import AttitudeBuffer, from_euler
 
 
 class Rocket3DWidget(QWidget):
     """A QWidget-based 3D Rocket Model that can be embedded inside a tab."""
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, render_clock=None):
         super().__init__(parent)
         self.setMaximumSize(200, 300)
         self.setMinimumSize(200, 300)
@@ -18,7 +19,8 @@ class Rocket3DWidget(QWidget):
         layout = QVBoxLayout()
         self.setLayout(layout)
 
-        # 3D View Widget
+        # 3D View Widget (OpenGL is only loaded once a 3D view is actually built)
+        import pyqtgraph.opengl as gl
         self.gl_widget = gl.GLViewWidget()
         layout.addWidget(self.gl_widget)
 
@@ -35,10 +37,8 @@ class Rocket3DWidget(QWidget):
         # Create the simple rocket shape
         self.create_rocket()
 
-        # Timer for real-time updates
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_view)
-        self.timer.start(50)  # Update every 50ms
+        # Frames come from the shared render clock (or a private 20 fps one when used standalone)
+        self.render_clock = render_clock if render_clock else RenderClock(fps=20)
 
         # Store rotation angles
         self.pitch = 0
@@ -46,7 +46,19 @@ class Rocket3DWidget(QWidget):
         self.roll = 0
         self.last_data_timestamp = time.time()
         self.fallback_mode = False  # If True, the model will rotate on its own
+        self.fallback_speed = 4.0  # Degrees of roll per second while rotating on its own
+        # Telemetry attitudes are interpolated to each frame's time; the model only moves when that changes
+        self.attitude = AttitudeBuffer()
+        self.shown = None  # Quaternion currently applied to the model
+        self.last_frame = time.perf_counter()
+
+        # One-shot watchdog instead of polling for connection loss every frame
+        self.data_watchdog = QTimer(self)
+        self.data_watchdog.setSingleShot(True)
+        self.data_watchdog.timeout.connect(self.enter_fallback_mode)
+        self.data_watchdog.start(2500)
         self.setup_camera()
+        self.render_clock.mark_dirty(self)
 
     def setup_camera(self):
         """Sets up initial camera angle for a slightly above perpendicular view."""
@@ -54,19 +66,13 @@ class Rocket3DWidget(QWidget):
         self.gl_widget.opts['elevation'] = 20  # Tilt slightly downward
         self.gl_widget.opts['azimuth'] = 90  # Keep looking from the front
 
-    def create_rocket(self, filename="data/rocket_stl_test.stl", scale_factor=3):
+    def create_rocket(self, filename="data/rocket_stl_test.STL", scale_factor=3, max_faces=20000):
         """Loads an STL file, scales it, and properly centers it for correct rotation and visibility."""
+        import pyqtgraph.opengl as gl
+        from pyqtgraph import Transform3D
 
-        # ✅ Load the STL File
-        stl_mesh = mesh.Mesh.from_file(filename)
-
-        # ✅ Extract Vertices & Faces
-        vertices = stl_mesh.vectors.reshape(-1, 3)  # Convert 3D triangle array to flat vertex array
-        faces = np.arange(len(vertices)).reshape(-1, 3)  # Generate face indices
-
-        # ✅ Convert to NumPy Arrays for PyQtGraph
-        vertices = np.array(vertices, dtype=np.float32)
-        faces = np.array(faces, dtype=np.int32)
+        # ✅ Load the indexed mesh (cached after the first parse), at most max_faces triangles
+        vertices, faces = mesh_cache.load_mesh(filename, max_faces=max_faces)
 
         # ✅ Compute Bounding Box
         min_bounds = np.min(vertices, axis=0)
@@ -102,27 +108,53 @@ class Rocket3DWidget(QWidget):
         # ✅ Add to the Scene
         self.gl_widget.addItem(self.rocket)
 
-    def update_view(self):
-        """Applies pitch, yaw, and roll rotations to the rocket model."""
-        # Check for connection loss (failsafe mode)
-        if time.time() - self.last_data_timestamp > 2.5:
-            self.fallback_mode = True  # Enable auto-rotation
-
+    def set_attitude(self, pitch, yaw, roll, timestamp=None):
+        """Stores a new attitude from telemetry (timestamp in seconds, if the sample has one) and schedules a frame"""
+        self.pitch, self.yaw, self.roll = pitch, yaw, roll
+        arrival = time.perf_counter()
+        self.attitude.add(from_euler(pitch, yaw, roll), arrival if timestamp is None else timestamp, arrival)
+        self.last_data_timestamp = time.time()
+        self.fallback_mode = False
+        self.data_watchdog.start(2500)
+        self.render_clock.mark_dirty(self)
+
+    def enter_fallback_mode(self):
+        """No data for 2.5 s: let the model rotate on its own"""
+        self.fallback_mode = True
+        self.render_clock.mark_dirty(self)
+
+    def render_frame(self):
+        """Called by the render clock; keeps requesting frames while the attitude is still moving"""
+        now = time.perf_counter()
         if self.fallback_mode:
             self.yaw = 0  # No yaw change in fallback mode
             self.pitch = 0  # No pitch change in fallback mode
-            self.roll += 0.2  # Minor roll variation
-
-        # Apply Rotation to Rocket
-        self.rocket.resetTransform()
-        self.rocket.rotate(self.roll, 0, 0, 1)  # Roll (Z-axis)
-        self.rocket.rotate(self.pitch, 0, 1, 0)  # Pitch (Y-axis)
-        self.rocket.rotate(self.yaw, 1, 0, 0)  # Pitch (X-axis)
+            self.roll += self.fallback_speed * min(now - self.last_frame, 0.1)  # Minor roll variation
+            q, moving = from_euler(self.pitch, self.yaw, self.roll), True
+        else:
+            q, moving = self.attitude.at(now)
+        self.last_frame = now
+
+        if q is not None:
+            self.update_view(q)
+        if moving:
+            self.render_clock.mark_dirty(self)
+
+    def update_view(self, q):
+        """Applies an attitude quaternion (w, x, y, z) to the rocket model as one transform."""
+        if self.shown is not None and abs(float(np.dot(q, self.shown))) > 1 - 1e-12:
+            return  # Unchanged, nothing to repaint
+        from pyqtgraph import Transform3D
+        self.shown = q
+        transform = Transform3D()
+        transform.rotate(QQuaternion(*(float(value) for value in q)))
+        self.rocket.setTransform(transform)
 
 
     def toggle_fallback_mode(self):
         """Manually triggers the fallback mode for slow autorotation."""
         self.fallback_mode = not self.fallback_mode
+        self.render_clock.mark_dirty(self)
 
 
 class Rocket2DWidget_Pitch(QWidget):
@@ -199,13 +231,22 @@ class Rocket2DWidget_Pitch(QWidget):
 
 
 class Rocket2DImagePitch(QWidget):
-    def __init__(self, image_path, scale=0.25, pitch_angle=0, rotate_start=0, color=None):
+    def __init__(self, image_path, scale=0.25, pitch_angle=0, rotate_start=0, color=None, render_clock=None,
+                 angle_step=0.5, max_sprites=180):
         super().__init__()
         self.scale = scale
-        self.iterate = 0
+        self.render_clock = render_clock
         self.image = QPixmap(image_path)
         self.pitch_angle = pitch_angle  # Initial pitch
 
+        # Pre-rotated copies of the image, one per angle_step, built the first time each is shown
+        self.angle_step = angle_step
+        self.steps = max(1, round(360 / angle_step))
+        self.step = self.step_for(pitch_angle)
+        self.sprites = OrderedDict()  # Step -> QPixmap, least recently shown first
+        self.max_sprites = max_sprites
+        self.sprite_ratio = None  # Device pixel ratio the sprites were rendered at
+
         #  Rotate image -90° (90° counterclockwise) at start
         transform = QTransform()
         transform.rotate(rotate_start)  # Counterclockwise rotation
@@ -233,42 +274,61 @@ class Rocket2DImagePitch(QWidget):
             # Save image
             self.image = colored_image
 
-        self.start_timer()
-
-    def change_pitch(self, esp=False):
-        """Increase pitch angle by 1 degree every 2 seconds"""
-        if not esp:
-            if self.iterate == 1:
-                self.pitch_angle += 5
-                self.iterate = 0
-            else:
-                self.pitch_angle -= 5
-                self.iterate = 1
+    def set_angle(self, angle):
+        """Takes a new telemetry angle; the repaint waits for the next render tick"""
+        if isinstance(angle, (list, tuple, np.ndarray)):
+            if not len(angle):
+                return
+            angle = angle[-1]  # Only the newest sample of a batch is visible
+        self.pitch_angle = float(angle)
+        step = self.step_for(self.pitch_angle)
+        if step == self.step:
+            return  # Would draw the same sprite
+        self.step = step
+        if self.render_clock:
+            self.render_clock.mark_dirty(self)
+        else:
+            self.update()
+
+    def render_frame(self):
         self.update()
 
-    def paintEvent(self, event):
-        """Draw the rotated image"""
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-
-        # Get image center for pivot
-        center_x = self.width() // 2
-        center_y = self.height() // 2
-
-        # Apply rotation
-        painter.translate(center_x, center_y)
-        painter.rotate(self.pitch_angle)
-        painter.translate(-center_x, -center_y)
-
+    def step_for(self, angle):
+        return round(angle / self.angle_step) % self.steps
+
+    def sprite(self, step):
+        """The image rotated to a step about its centre, rendered once and then reused"""
+        ratio = self.devicePixelRatioF()
+        if ratio != self.sprite_ratio:
+            self.sprites.clear()  # Moved to a screen with a different scale
+            self.sprite_ratio = ratio
+        sprite = self.sprites.get(step)
+        if sprite is not None:
+            self.sprites.move_to_end(step)
+            return sprite
+
+        transform = QTransform().rotate(step * self.angle_step)
+        bounds = transform.mapRect(QRectF(self.image.rect())).toAlignedRect()
+        sprite = QPixmap(bounds.size() * ratio)
+        sprite.setDevicePixelRatio(ratio)
+        sprite.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(sprite)
+        painter.setRenderHints(QPainter.RenderHint.Antialiasing | QPainter.RenderHint.SmoothPixmapTransform)
+        painter.translate(bounds.width() / 2, bounds.height() / 2)
+        painter.rotate(step * self.angle_step)
+        painter.drawPixmap(-self.image.width() // 2, -self.image.height() // 2, self.image)
+        painter.end()
 
-        img_x = center_x - self.image.width() // 2
-        img_y = center_y - self.image.height() // 2
-        painter.drawPixmap(img_x, img_y, self.image)
+        self.sprites[step] = sprite
+        if len(self.sprites) > self.max_sprites:
+            self.sprites.popitem(last=False)
+        return sprite
 
+    def paintEvent(self, event):
+        """Blit the pre-rotated sprite for the current step, centred"""
+        sprite = self.sprite(self.step)
+        size = sprite.deviceIndependentSize()
+        painter = QPainter(self)
+        painter.drawPixmap(round((self.width() - size.width()) / 2), round((self.height() - size.height()) / 2),
+                           sprite)
         painter.end()
-
-    def start_timer(self):
-        """Start a timer that updates the pitch every 2 seconds"""
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.change_pitch)
-        self.timer.start(100)
@@ -0,0 +1,67 @@
+import asyncio, threading
+
+
+class NetworkEngine:
+    """Owns the asyncio loop every ESP32 endpoint runs on.
+
+    The loop lives in one daemon thread. Endpoints and long-running tasks are registered here, so
+    stop() tears all of them down at once instead of waiting out socket timeouts.
+    """
+
+    def __init__(self):
+        self.loop = None
+        self.thread = None
+        self.transports = []
+        self.tasks = []
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        ready = threading.Event()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.run_loop, args=(ready,), daemon=True, name="network")
+        self.thread.start()
+        ready.wait()
+
+    def run_loop(self, ready):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(ready.set)
+        self.loop.run_forever()
+        self.loop.close()
+
+    def stop(self, timeout=2.0):
+        """Closes every endpoint, cancels every task and joins the loop thread"""
+        if not self.running:
+            return
+        self.loop.call_soon_threadsafe(self.loop.create_task, self.shutdown())
+        self.thread.join(timeout)
+
+    async def shutdown(self):
+        for transport in self.transports:
+            transport.close()
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.transports, self.tasks = [], []
+        self.loop.stop()
+
+    def call_soon(self, callback, *args):
+        """Runs a plain callback on the network loop from any thread"""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def start_task(self, coro):
+        """Starts a long-running coroutine from any thread; it is cancelled on stop()"""
+        self.loop.call_soon_threadsafe(lambda: self.tasks.append(self.loop.create_task(coro)))
+
+    def open_datagram_endpoint(self, protocol_factory, sock):
+        """Attaches a datagram protocol to an already bound socket; closed on stop()"""
+        async def open_endpoint():
+            transport, protocol = await self.loop.create_datagram_endpoint(protocol_factory, sock=sock)
+            self.transports.append(transport)
+            return protocol
+
+        return asyncio.run_coroutine_threadsafe(open_endpoint(), self.loop).result()
@@ -0,0 +1,105 @@
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QGraphicsDropShadowEffect
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor, QFont
+import pyqtgraph as pg
+from controllers.telemetry_store import TelemetryStore
+
+
+class PgGraphWidget(QWidget):
+    """Drop-in pyqtgraph version of GraphWidget for high-rate strip charts"""
+    def __init__(self, router, title=None, x_lab=None, y_lab=None, parent=None, bg_color='#242424', x=None,
+                 y=None,
+                 time_window=10, sample_rate=10, render_clock=None, store=None):
+        super().__init__(parent)
+        self.router = router
+        self.render_clock = render_clock
+        self.setMaximumHeight(200)
+
+        self.plot = pg.PlotWidget(background=bg_color)
+        self.plot.setTitle(f"{title}", color='white', size='7pt')
+        label_style = {'color': 'white', 'font-size': '6pt'}
+        self.plot.setLabel('bottom', f"{x_lab}", **label_style)
+        self.plot.setLabel('left', f"{y_lab}", **label_style)
+        tick_font = QFont()
+        tick_font.setPointSize(5)
+        for axis in ('bottom', 'left'):
+            self.plot.getAxis(axis).setTextPen('white')
+            self.plot.getAxis(axis).setStyle(tickFont=tick_font)
+
+        # Only draw what is on screen, and at most a peak-preserving point per pixel
+        self.plot.setClipToView(True)
+        self.plot.setDownsampling(auto=True, mode='peak')
+        self.plot.enableAutoRange(x=False, y=True)
+        self.curve = self.plot.plot(pen=pg.mkPen('yellow', width=0.5))
+
+        shadow = QGraphicsDropShadowEffect()
+        shadow.setBlurRadius(20)
+        shadow.setXOffset(5)
+        shadow.setYOffset(5)
+        shadow.setColor(QColor(0, 0, 0, 80))
+        self.setGraphicsEffect(shadow)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.plot)
+        layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.setLayout(layout)
+
+        self.own_store = store is None
+        self.store = store if store is not None else TelemetryStore.for_window([y_lab], time_window, sample_rate,
+                                                                             time_key=x_lab)
+        if x and y and self.own_store:
+            self.store.append({x_lab: x, y_lab: y})
+        self.title = title
+        self.x_l = x_lab
+        self.y_l = y_lab
+        self.time_window = time_window
+        self.manual_scroll = False
+
+        # Clicking, dragging or zooming the plot stops auto-scroll until new data passes the view
+        self.plot.scene().sigMouseClicked.connect(self.on_mouse_press)
+        self.plot.getViewBox().sigRangeChangedManually.connect(self.on_manual_range)
+
+        self.plot_graph()
+
+        if self.router:
+            self.router.subscribe((self.x_l, self.y_l), self.update_data)
+
+    def on_mouse_press(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.manual_scroll = True
+
+    def on_manual_range(self, *args):
+        self.manual_scroll = True
+        self.plot_graph()  # The panned-to range may need samples outside the last window
+
+    def plot_graph(self):
+        latest_time = self.store.latest()
+        if latest_time is None:
+            return
+        if self.manual_scroll:
+            left, right = self.plot.viewRange()[0]
+            x, y = self.store.window(self.y_l, left, right)
+        else:
+            x, y = self.store.window(self.y_l, latest_time - self.time_window - 1)
+        # pyqtgraph keeps the arrays it is given, and the store reuses this memory on later appends.
+        # The finite check stays on: derived channels the packets don't carry (LMV, Force, Pitch) are NaN
+        self.curve.setData(x.copy(), y.copy())
+        if not self.manual_scroll:
+            start_time = max(0, latest_time - self.time_window)
+            self.plot.setXRange(start_time - 1, latest_time, padding=0)
+
+    def render_frame(self):
+        """Called by the render clock once per frame while this graph has new data"""
+        self.plot_graph()
+
+    def update_data(self, x_data, y_data):
+        if self.own_store:
+            self.store.append({self.x_l: x_data, self.y_l: y_data})
+        if self.manual_scroll:
+            latest_time = self.store.latest()
+            if latest_time is not None and latest_time > self.plot.viewRange()[0][1]:
+                self.manual_scroll = False
+        if self.render_clock:
+            self.render_clock.mark_dirty(self)
+        else:
+            self.plot_graph()
@@ -0,0 +1,262 @@
+"""Append-only telemetry recording in preallocated, memory-mapped segment files.
+
+A session is a directory of segment_NNNNN.rec files. Each segment starts with a 64 KiB header:
+
+    magic         8 bytes   b"RTREC", null padded
+    version       uint32
+    index_count   uint32    entries used in the seek index below
+    data_end      uint64    end of the last complete record (committed after each record)
+    record_count  uint64
+    first_ns      int64     receive time of the first record (time.time_ns)
+    last_ns       int64     receive time of the last record
+    reserved      16 bytes
+    index         (recv_ns int64, offset uint64) every ~16 KiB of records
+
+followed by records of [magic uint32, length uint32, recv_ns int64, payload padded to 8 bytes].
+The payload is the raw telemetry batch exactly as it came off the socket. Because data_end only
+moves after a record is complete, a crash loses at most the record being written.
+"""
+import json, mmap, os, struct, threading, queue
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+
+SEGMENT_MAGIC = b"RTREC"
+FORMAT_VERSION = 1
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u4"),
+    ("index_count", "<u4"),
+    ("data_end", "<u8"),
+    ("record_count", "<u8"),
+    ("first_ns", "<i8"),
+    ("last_ns", "<i8"),
+    ("reserved", "u1", 16),
+])
+INDEX_DTYPE = np.dtype([("recv_ns", "<i8"), ("offset", "<u8")])
+HEADER_SIZE = 64 * 1024
+INDEX_CAPACITY = (HEADER_SIZE - HEADER_DTYPE.itemsize) // INDEX_DTYPE.itemsize
+INDEX_EVERY = 16 * 1024  # Bytes of records between seek index entries
+
+RECORD = struct.Struct("<IIq")
+RECORD_MAGIC = 0x43455254  # b"TREC"
+
+
+def padded(size):
+    return (size + 7) & ~7
+
+
+class Segment:
+    """One mapped segment file, either being written or opened for reading"""
+
+    def __init__(self, path, size=None):
+        self.path = Path(path)
+        if size:
+            # New segment: reserve the whole file up front so appends never grow it
+            self.file = open(self.path, "w+b")
+            self.file.truncate(size)
+            self.map = mmap.mmap(self.file.fileno(), size)
+        else:
+            self.file = open(self.path, "rb")
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.header = np.frombuffer(self.map, HEADER_DTYPE, count=1)
+        self.index = np.frombuffer(self.map, INDEX_DTYPE, count=INDEX_CAPACITY, offset=HEADER_DTYPE.itemsize)
+        if size:
+            self.header["magic"] = SEGMENT_MAGIC
+            self.header["version"] = FORMAT_VERSION
+            self.header["data_end"] = HEADER_SIZE
+        elif self.header["magic"][0] != SEGMENT_MAGIC:
+            raise ValueError(f"{self.path} is not a telemetry recording")
+
+        self.data_end = int(self.header["data_end"][0])
+        self.last_indexed = -INDEX_EVERY
+
+    @property
+    def first_ns(self):
+        return int(self.header["first_ns"][0])
+
+    @property
+    def last_ns(self):
+        return int(self.header["last_ns"][0])
+
+    @property
+    def record_count(self):
+        return int(self.header["record_count"][0])
+
+    def fits(self, payload_size):
+        return self.data_end + RECORD.size + padded(payload_size) <= len(self.map)
+
+    def append(self, recv_ns, payload):
+        """Copies one record into the mapping; the header is committed last"""
+        offset = self.data_end
+        size = len(payload)
+        RECORD.pack_into(self.map, offset, RECORD_MAGIC, size, recv_ns)
+        self.map[offset + RECORD.size:offset + RECORD.size + size] = payload
+
+        header = self.header[0]
+        count = int(header["index_count"])
+        if offset - self.last_indexed >= INDEX_EVERY and count < INDEX_CAPACITY:
+            self.index[count] = (recv_ns, offset)
+            header["index_count"] = count + 1
+            self.last_indexed = offset
+        if not header["record_count"]:
+            header["first_ns"] = recv_ns
+        header["last_ns"] = recv_ns
+        header["record_count"] += 1
+        self.data_end = offset + RECORD.size + padded(size)
+        header["data_end"] = self.data_end
+
+    def records(self, offset=HEADER_SIZE):
+        """Yields (recv_ns, payload view) from offset up to the last committed record"""
+        while offset < self.data_end:
+            magic, size, recv_ns = RECORD.unpack_from(self.map, offset)
+            if magic != RECORD_MAGIC:
+                break
+            start = offset + RECORD.size
+            yield recv_ns, memoryview(self.map)[start:start + size]
+            offset = start + padded(size)
+
+    def offset_for(self, recv_ns):
+        """Offset of the first record received at or after recv_ns"""
+        count = int(self.header["index_count"][0])
+        entries = self.index[:count]
+        position = np.searchsorted(entries["recv_ns"], recv_ns, side="right") - 1
+        offset = int(entries["offset"][position]) if position >= 0 else HEADER_SIZE
+        while offset < self.data_end:
+            magic, size, stamp = RECORD.unpack_from(self.map, offset)
+            if magic != RECORD_MAGIC or stamp >= recv_ns:
+                break
+            offset += RECORD.size + padded(size)
+        return offset
+
+    def close(self, trim=False):
+        self.header = self.index = None  # Release the views before unmapping
+        if not self.map.closed:
+            if trim:
+                self.map.flush()
+            try:
+                self.map.close()
+            except BufferError:
+                return  # A reader still holds payload views; the map goes when they do
+        if trim:
+            self.file.truncate(self.data_end)  # Give back the unused preallocation
+        self.file.close()
+
+
+class TelemetryRecorder:
+    """Always-on recorder for raw telemetry batches.
+
+    append() only queues the batch; a writer thread copies it into the current mapped segment
+    (no syscalls per batch) and opens the next preallocated segment when one fills up. Nothing is
+    created on disk until the first batch arrives.
+    """
+
+    def __init__(self, directory="recordings", segment_size=64 * 1024 * 1024, session=None):
+        self.directory = Path(directory)
+        self.segment_size = max(segment_size, HEADER_SIZE * 2)
+        self.session = Path(session) if session else None  # Named on the first write unless given
+        self.segment = None
+        self.segment_number = 0
+        self.inbox = queue.SimpleQueue()
+        self.thread = None
+        self.bytes_written = 0
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.thread = threading.Thread(target=self.write_loop, daemon=True, name="recorder")
+        self.thread.start()
+
+    def stop(self):
+        if self.thread and self.thread.is_alive():
+            self.inbox.put(None)
+            self.thread.join()
+
+    def new_session(self):
+        """Directory a session starting now records into"""
+        return self.directory / datetime.now().strftime("%Y%m%d-%H%M%S")
+
+    def append(self, recv_ns, payload):
+        """Queues a raw batch from any thread"""
+        self.inbox.put((recv_ns, payload))
+
+    def save_json(self, name, data):
+        """Writes a side file into the session directory, if this session has recorded anything"""
+        if self.session is None or not self.session.exists():
+            return
+        try:
+            with open(self.session / name, "w") as file:
+                json.dump(data, file, indent=2)
+        except OSError as e:
+            print(f"Recorder error: {e}")
+
+    def write_loop(self):
+        while True:
+            item = self.inbox.get()
+            if item is None:
+                break
+            try:
+                self.write(*item)
+            except Exception as e:
+                print(f"Recorder error: {e}")
+        if self.segment:
+            self.segment.close(trim=True)
+            self.segment = None
+
+    def write(self, recv_ns, payload):
+        if self.segment is None or not self.segment.fits(len(payload)):
+            self.roll_over()
+        self.segment.append(recv_ns, payload)
+        self.bytes_written += len(payload)
+
+    def roll_over(self):
+        if self.session is None:
+            self.session = self.new_session()
+        os.makedirs(self.session, exist_ok=True)
+        if self.segment:
+            self.segment.close(trim=True)
+        path = self.session / f"segment_{self.segment_number:05d}.rec"
+        self.segment = Segment(path, size=self.segment_size)
+        self.segment_number += 1
+
+
+class RecordingReader:
+    """Opens a recorded session; only segment headers are read up front"""
+
+    def __init__(self, session_dir):
+        self.session = Path(session_dir)
+        self.segments = []
+        for path in sorted(self.session.glob("segment_*.rec")):
+            segment = Segment(path)
+            if segment.record_count:
+                self.segments.append(segment)
+            else:
+                segment.close()  # Empty, e.g. created right before a crash; keep no map or handle open
+        self.segment_starts = np.array([segment.first_ns for segment in self.segments], dtype=np.int64)
+
+    @property
+    def start_ns(self):
+        return self.segments[0].first_ns if self.segments else 0
+
+    @property
+    def end_ns(self):
+        return self.segments[-1].last_ns if self.segments else 0
+
+    @property
+    def record_count(self):
+        return sum(segment.record_count for segment in self.segments)
+
+    def records(self, start_ns=None):
+        """Yields (recv_ns, payload view) in order, optionally starting at a receive time"""
+        first = 0
+        offset = HEADER_SIZE
+        if start_ns is not None and self.segments:
+            first = max(0, int(np.searchsorted(self.segment_starts, start_ns, side="right")) - 1)
+            offset = self.segments[first].offset_for(start_ns)
+        for number in range(first, len(self.segments)):
+            yield from self.segments[number].records(offset if number == first else HEADER_SIZE)
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
@@ -0,0 +1,74 @@
+from PyQt6.QtCore import QObject, QTimer, Qt, QEvent
+
+
+class RenderClock(QObject):
+    """Shared frame clock so data ingestion never paints directly.
+
+    Widgets call mark_dirty() when they take in new data and implement render_frame(). Once per
+    tick every dirty, visible widget is rendered once, however many samples arrived in between.
+    Sources added with add_source() are polled at the start of every tick, so data they pull in
+    is painted in that same frame.
+
+    A dirty widget that is hidden is parked instead of being retried every tick, so the clock can
+    stop. Its show event puts it back in the queue.
+    """
+
+    def __init__(self, fps=30, latency=None):
+        super().__init__()
+        self.dirty = {}  # Insertion-ordered set of widgets waiting for a frame
+        self.hidden = {}  # Dirty widgets that were hidden at their frame, waiting to be shown
+        self.sources = []  # Callables polled for new data before each frame
+        self.frames = 0
+        self.latency = latency  # Optional LatencyTracker told when a frame has been painted
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self.tick)
+        self.set_fps(fps)
+
+    def set_fps(self, fps):
+        """Changes the target frame rate, takes effect on the next tick"""
+        self.fps = max(1, fps)
+        self.timer.setInterval(max(1, round(1000 / self.fps)))
+
+    def add_source(self, source):
+        self.sources.append(source)
+        self.timer.start()  # Polled sources keep the clock running
+
+    def remove_source(self, source):
+        if source in self.sources:
+            self.sources.remove(source)
+
+    def mark_dirty(self, widget):
+        if widget in self.hidden:
+            return  # Already waiting for its show event
+        self.dirty[widget] = None
+        if not self.timer.isActive():
+            self.timer.start()  # The clock sleeps while nothing needs painting
+
+    def tick(self):
+        """Renders every dirty widget that can currently be seen"""
+        for source in self.sources:
+            source()
+        pending, self.dirty = self.dirty, {}
+        for widget in pending:
+            if widget.isVisible():
+                widget.render_frame()
+            else:
+                self.hidden[widget] = None
+                widget.installEventFilter(self)
+        self.frames += 1
+        if self.latency:
+            # Zero-timeout timers run after the paint events this tick posted
+            QTimer.singleShot(0, self.latency.frame_painted)
+
+        if not self.dirty and not self.sources:
+            self.timer.stop()
+
+    def eventFilter(self, widget, event):
+        """Shown again: a parked widget gets its frame on the next tick"""
+        if event.type() == QEvent.Type.Show and widget in self.hidden:
+            del self.hidden[widget]
+            widget.removeEventFilter(self)
+            self.mark_dirty(widget)
+        return False
@@ -0,0 +1,145 @@
+import threading
+import time
+from PyQt6.QtCore import QObject, pyqtSignal
+from controllers import telemetry_packet
+from controllers.recorder import RecordingReader
+
+
+class ReplayEngine(QObject):
+    """Feeds a recorded session back through DataController.submit, the same path live data takes.
+
+    speed is a playback multiplier (1 = real time); 0 plays as fast as the GUI absorbs it, which
+    is limited by keeping at most max_in_flight batches between submit and the router.
+    """
+    position_changed = pyqtSignal(float)  # Seconds from the start of the recording
+    finished = pyqtSignal(dict)  # Throughput of the pass that just ended
+
+    def __init__(self, data_controller, session_dir, router=None, speed=1.0, max_in_flight=64):
+        super().__init__()
+        self.data_controller = data_controller
+        self.router = router
+        self.reader = RecordingReader(session_dir)
+        self.speed = speed
+        self.max_in_flight = max_in_flight
+
+        self.paused = False
+        self.stopping = False
+        self.seek_to = None  # Receive time (ns) to restart from
+        self.wake = threading.Event()  # Set on any control change
+        self.thread = None
+
+    @property
+    def duration(self):
+        return (self.reader.end_ns - self.reader.start_ns) / 1e9
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        # Live simulation would interleave with the recording
+        self.data_controller.simulate = False
+        self.stopping = False
+        self.thread = threading.Thread(target=self.run, daemon=True, name="replay")
+        self.thread.start()
+
+    def stop(self):
+        self.stopping = True
+        self.wake.set()
+        if self.thread:
+            self.thread.join()
+
+    def pause(self):
+        self.paused = True
+        self.wake.set()
+
+    def resume(self):
+        self.paused = False
+        self.wake.set()
+
+    def set_speed(self, speed):
+        self.speed = speed
+        self.wake.set()
+
+    def seek(self, seconds):
+        """Jumps to a time from the start of the recording"""
+        self.seek_to = self.reader.start_ns + int(seconds * 1e9)
+        self.wake.set()
+
+    def run(self):
+        start_ns = self.reader.start_ns
+        while not self.stopping:
+            report = self.play(start_ns)
+            if self.stopping:
+                break
+            if self.seek_to is None:
+                # Reached the end: report, then idle until a seek or stop
+                self.finished.emit(report)
+                print(f"Replay: {report['samples']} samples in {report['seconds']:.2f} s "
+                      f"({report['samples_per_s']:.0f} samples/s)")
+                while not self.stopping and self.seek_to is None:
+                    self.wake.wait()
+                    self.wake.clear()
+            start_ns, self.seek_to = self.seek_to, None
+
+    def play(self, start_ns):
+        """Plays from start_ns until the end, a seek or a stop. Returns the throughput"""
+        samples = 0
+        batches = 0
+        routed_base = self.router.packets_routed if self.router else 0
+        started = time.perf_counter()
+        anchor = None  # (recv_ns, wall time) that playback is timed against
+        last_position = 0.0
+
+        for recv_ns, payload in self.reader.records(start_ns):
+            anchor = self.wait_until_due(recv_ns, anchor)
+            if anchor is False:
+                break
+
+            records = telemetry_packet.decode(bytes(payload))
+            self.data_controller.submit(records)
+            samples += len(records)
+            batches += 1
+
+            if self.router:
+                # Don't run ahead of what the GUI thread has actually taken in
+                while batches - (self.router.packets_routed - routed_base) > self.max_in_flight:
+                    if self.stopping or self.seek_to is not None:
+                        break
+                    time.sleep(0.0005)
+
+            now = time.perf_counter()
+            if now - last_position >= 0.1:
+                last_position = now
+                self.position_changed.emit((recv_ns - self.reader.start_ns) / 1e9)
+
+        if self.router and not (self.stopping or self.seek_to is not None):
+            # Count the pass as done once the GUI has taken in the tail too. Not after a stop:
+            # stop() joins this thread on the GUI thread, which then can't route the tail
+            deadline = time.perf_counter() + 5.0
+            while self.router.packets_routed - routed_base < batches and time.perf_counter() < deadline:
+                if self.stopping:
+                    break
+                time.sleep(0.0005)
+        seconds = time.perf_counter() - started
+        return {"samples": samples, "batches": batches, "seconds": seconds,
+                "samples_per_s": samples / seconds if seconds else 0.0, "speed": self.speed}
+
+    def wait_until_due(self, recv_ns, anchor):
+        """Sleeps until a record is due at the current speed. Returns the anchor, False to abort"""
+        while True:
+            if self.stopping or self.seek_to is not None:
+                return False
+            if self.paused:
+                self.wake.wait()
+                self.wake.clear()
+                anchor = None
+                continue
+            if self.speed <= 0:
+                return anchor  # Max speed
+            if anchor is None:
+                anchor = (recv_ns, time.perf_counter())
+            delay = anchor[1] + (recv_ns - anchor[0]) / 1e9 / self.speed - time.perf_counter()
+            if delay <= 0:
+                return anchor
+            if self.wake.wait(delay):
+                self.wake.clear()
+                anchor = None  # Speed or state changed, re-time from this record
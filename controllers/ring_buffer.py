@@ -0,0 +1,63 @@
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity numeric history that always reads back as one contiguous array.
+
+    With rows set it holds that many columns side by side, all filled together: extend() takes
+    a (rows, n) block and view() returns a (rows, size) array whose rows are each contiguous.
+    """
+
+    def __init__(self, capacity, dtype=np.float64, rows=None):
+        self.capacity = max(1, int(capacity))
+        self.rows = rows
+        shape = (2 * self.capacity,) if rows is None else (rows, 2 * self.capacity)
+        # Every sample is written twice, one capacity apart, so the newest window is never split
+        self._data = np.zeros(shape, dtype=dtype)
+        self._head = 0  # Slot the next sample goes into
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, item):
+        return self.view()[item]
+
+    def extend(self, values):
+        """Appends samples, dropping the oldest ones once the buffer is full"""
+        values = np.asarray(values, dtype=self._data.dtype)
+        if self.rows is None:
+            values = values.ravel()
+        count = values.shape[-1]
+        if count == 0:
+            return
+        if count > self.capacity:
+            values = values[..., -self.capacity:]
+            count = self.capacity
+
+        cap = self.capacity
+        start = self._head
+        first = min(count, cap - start)  # Samples that fit before wrapping
+        self._data[..., start:start + first] = values[..., :first]
+        self._data[..., start + cap:start + cap + first] = values[..., :first]
+        rest = count - first
+        if rest:
+            self._data[..., :rest] = values[..., first:]
+            self._data[..., cap:cap + rest] = values[..., first:]
+
+        self._head = (start + count) % cap
+        self._size = min(self._size + count, cap)
+
+    def append(self, value):
+        self.extend((value,))
+
+    def view(self):
+        """Returns a read-only view of the stored samples, oldest first (no copy)"""
+        end = self._head + self.capacity
+        window = self._data[..., end - self._size:end]
+        window.flags.writeable = False
+        return window
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
@@ -0,0 +1,81 @@
+"""Binary telemetry frame shared by the ESP32 firmware, the receiver and the recorder.
+
+Every frame is a fixed-size, little-endian, unpadded struct:
+
+    magic          2 bytes   b"RT"
+    version        uint8     FORMAT_VERSION
+    channel_count  uint8     number of sensor channels that follow
+    seq            uint32    frame counter, wraps
+    timestamp_us   uint64    device clock in microseconds
+    <sensor>       float32   one per config.json SENSORS entry, in order
+    valves         uint16    bit i set = VALVES[i] open (uint32 past 16 valves)
+"""
+import numpy as np
+from misc.file_handler import load_file
+
+MAGIC = b"RT"
+FORMAT_VERSION = 1
+MAX_DATAGRAM = 1472  # Largest UDP payload that fits one Ethernet frame
+RESTART_GAP = 1.0  # Seconds timestamps may go back (reordered or late frames) before it counts as a restart
+
+
+def packet_dtype(sensors, valves):
+    """Builds the NumPy layout of one frame for the given channel lists"""
+    return np.dtype([
+        ("magic", "S2"),
+        ("version", "u1"),
+        ("channel_count", "u1"),
+        ("seq", "<u4"),
+        ("timestamp_us", "<u8"),
+        *[(name, "<f4") for name in sensors],
+        ("valves", "<u2" if len(valves) <= 16 else "<u4"),
+    ])
+
+
+config = load_file("data/config.json")
+SENSORS = config["SENSORS"]
+VALVES = config["VALVES"]
+PACKET_DTYPE = packet_dtype(SENSORS, VALVES)
+PACKET_SIZE = PACKET_DTYPE.itemsize
+
+
+def decode(buffer, dtype=PACKET_DTYPE):
+    """Decodes one or more back-to-back frames into a structured array, dropping invalid ones"""
+    records = np.frombuffer(buffer, dtype=dtype, count=len(buffer) // dtype.itemsize)
+    valid = (records["magic"] == MAGIC) & (records["version"] == FORMAT_VERSION)
+    return records if valid.all() else records[valid]
+
+
+def encode(seq, timestamp_us, sensors, valves, dtype=PACKET_DTYPE):
+    """Packs frames for senders and tests. sensors is (frames, channels), the rest broadcast"""
+    sensors = np.atleast_2d(np.asarray(sensors, dtype=np.float32))
+    frames = np.zeros(len(sensors), dtype=dtype)
+    frames["magic"] = MAGIC
+    frames["version"] = FORMAT_VERSION
+    frames["channel_count"] = sensors.shape[1]
+    frames["seq"] = seq
+    frames["timestamp_us"] = timestamp_us
+    for i, name in enumerate(dtype.names[5:-1]):
+        frames[name] = sensors[:, i]
+    frames["valves"] = valves
+    return frames.tobytes()
+
+
+def valve_states(bits, valves=None):
+    """Unpacks VALVES bitfields, one per frame, into a (frames, valves) bool array.
+
+    valves picks the bit indices to unpack, every entry of VALVES by default.
+    """
+    bits = np.atleast_1d(np.asarray(bits, dtype=np.int64)).ravel()
+    valves = np.arange(len(VALVES)) if valves is None else np.asarray(valves, dtype=np.int64)
+    return (bits[:, None] >> valves) & 1 == 1
+
+
+def to_channels(records):
+    """Column views keyed the way the router expects (time, one key per sensor, VALVES)"""
+    channels = {"time": records["timestamp_us"] / 1e6}
+    for name in records.dtype.names[5:-1]:
+        channels[name] = records[name]
+    channels["VALVES"] = records["valves"]
+    channels["seq"] = records["seq"]
+    return channels
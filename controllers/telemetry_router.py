@@ -0,0 +1,47 @@
+from PyQt6.QtCore import QObject, Qt
+
+
+class TelemetryRouter(QObject):
+    """Single fan-out point between the DataController and every widget that shows its data"""
+
+    def __init__(self, data_controller=None, latency=None, store=None):
+        super().__init__()
+        self.latency = latency  # Optional LatencyTracker, stamped once widgets have the data
+        self.store = store  # Optional TelemetryStore, filled once per packet before any subscriber runs
+        # Each subscription is indexed under its last key (the channel being shown), so a packet
+        # only ever visits the subscribers of channels it actually carries
+        self.by_key = {}
+        self.packets_routed = 0
+
+        if data_controller:
+            data_controller.data_signal.connect(self.route, type=Qt.ConnectionType.QueuedConnection)
+
+    def subscribe(self, keys, callback):
+        """Calls callback(*values) for every packet holding all keys. Returns a handle for unsubscribe"""
+        keys = tuple(keys)
+        entry = (keys, callback)
+        # Copy-on-write so (un)subscribing from inside a callback can't disturb a route in progress
+        self.by_key[keys[-1]] = self.by_key.get(keys[-1], ()) + (entry,)
+        return entry
+
+    def unsubscribe(self, handle):
+        keys = handle[0]
+        remaining = tuple(entry for entry in self.by_key.get(keys[-1], ()) if entry is not handle)
+        if remaining:
+            self.by_key[keys[-1]] = remaining
+        else:
+            self.by_key.pop(keys[-1], None)
+
+    def route(self, data):
+        """Hands one packet to each interested subscriber exactly once"""
+        if self.store is not None:
+            self.store.append(data)
+        delivered = 0
+        for key in data:
+            for keys, callback in self.by_key.get(key, ()):
+                if all(k in data for k in keys):
+                    callback(*(data[k] for k in keys))
+                    delivered += 1
+        if delivered and self.latency and "_received" in data:
+            self.latency.ingested(data["_received"])
+        self.packets_routed += 1
@@ -0,0 +1,190 @@
+"""One shared, preallocated home for every telemetry channel.
+
+Samples are stored struct-of-arrays: a single time column plus one row per channel, all in
+one RingBuffer, so each channel reads back as a contiguous slice that widgets use directly.
+The router appends each packet once, before any widget sees it, and every graph of a channel
+reads the same memory. Another view of an existing channel adds no copy and no ingest work.
+
+Coarser min/max levels for zooming out are kept here too, reduced for all channels at once.
+"""
+import math
+import numpy as np
+from controllers.ring_buffer import RingBuffer
+from controllers.decimation import run_min_max
+from controllers.telemetry_packet import RESTART_GAP, valve_states
+
+REORDER_FRAMES = 1024  # Frame counter steps back further than reordering ever moves a frame
+
+
+class TelemetryStore:
+    def __init__(self, channels, capacity=2 ** 16, time_key="time", valves=(), factors=(16, 256),
+                 level_capacity=2 ** 16, dtype=np.float32):
+        self.channels = list(channels)
+        self.index = {name: row for row, name in enumerate(self.channels)}
+        self.time_key = time_key
+        self.dtype = dtype
+        # Valves arrive as one bitfield (VALVES); each valve with a row gets its own 0/1 column
+        self.valve_rows = np.array([self.index[v] for v in valves if v in self.index], dtype=np.intp)
+        self.valve_bits = np.array([bit for bit, v in enumerate(valves) if v in self.index], dtype=np.intp)
+
+        self.time = RingBuffer(capacity)
+        self.values = RingBuffer(capacity, dtype=dtype, rows=len(self.channels))
+
+        # Level i holds the min and max of every factors[i] samples, with each point's own time
+        self.factors = tuple(factors)
+        self.levels = [(RingBuffer(level_capacity, rows=len(self.channels)),
+                        RingBuffer(level_capacity, dtype=dtype, rows=len(self.channels))) for _ in self.factors]
+        # Raw samples reduce factor at a time; coarser levels read min/max pairs from the level below
+        self.runs = [factor // previous * (2 if previous > 1 else 1)
+                     for previous, factor in zip((1,) + self.factors, self.factors)]
+        self.pending = [0] * len(self.factors)  # Newest entries of the level below not reduced yet
+        self.version = 0  # Bumped on every append, for readers that cache derived data
+        self.late = 0  # Samples dropped because they arrived after newer ones were stored
+        self.last_seq = None  # Newest frame counter seen, when packets carry one
+
+    @classmethod
+    def from_config(cls, config, factors=(16, 256)):
+        """Derived channels, sensors, the raw valve bitfield and one column per valve.
+
+        Raw samples cover the strip chart window (GRAPH_WINDOW) at SAMPLE_RATE, and the coarsest
+        level covers ZOOM_HISTORY_S. Levels are cut back to fit STORE_MEMORY_MB, with a warning
+        saying how far zooming out then reaches.
+        """
+        channels = config.get("DERIVED_CHANNELS", []) + config["SENSORS"] + ["VALVES"] + config["VALVES"]
+        rate = config.get("SAMPLE_RATE", 10)
+        capacity = max(config.get("STORE_CAPACITY", 2 ** 16), cls.window_capacity(config.get("GRAPH_WINDOW", 10), rate))
+        # Every level holds the same number of points, level i spanning factors[i] samples per pair
+        history = config.get("ZOOM_HISTORY_S", 7200)
+        level_capacity = max(2 ** 12, math.ceil(history * rate * 2 / factors[-1]))
+
+        # Both RingBuffers store everything twice; raw rows share one time column, level rows don't
+        budget = config.get("STORE_MEMORY_MB", 512) * 2 ** 20
+        raw_bytes = 2 * capacity * (8 + 4 * len(channels))
+        level_bytes = 2 * len(factors) * len(channels) * (8 + 4)
+        if raw_bytes > budget:
+            print(f"Telemetry store: the {config.get('GRAPH_WINDOW', 10)} s window at {rate} Hz needs "
+                  f"{raw_bytes / 2 ** 20:.0f} MB, over STORE_MEMORY_MB")
+        if raw_bytes + level_capacity * level_bytes > budget:
+            level_capacity = max(2 ** 12, int(max(0, budget - raw_bytes) // level_bytes))
+            print(f"Telemetry store: zooming out reaches {level_capacity * factors[-1] / 2 / rate / 60:.0f} min "
+                  f"of ZOOM_HISTORY_S {history / 60:.0f} min at {rate} Hz; raise STORE_MEMORY_MB to keep more")
+        return cls(channels, capacity=capacity, valves=config["VALVES"], factors=factors,
+                   level_capacity=level_capacity)
+
+    @staticmethod
+    def window_capacity(time_window, sample_rate, headroom=2.0):
+        """Samples to hold a strip chart window (plus scroll step and 1 s plot margin) at a sample rate"""
+        return math.ceil((time_window * 1.1 + 1) * sample_rate * headroom)
+
+    @classmethod
+    def for_window(cls, channels, time_window, sample_rate, time_key="time"):
+        """Small private store for a single view"""
+        return cls(channels, capacity=cls.window_capacity(time_window, sample_rate), time_key=time_key)
+
+    def __contains__(self, channel):
+        return channel in self.index
+
+    def __len__(self):
+        return len(self.time)
+
+    def append(self, data):
+        """Adds one packet. Channels it doesn't carry are NaN for its samples.
+
+        Time must stay sorted for slicing: a reordered packet is sorted, and samples older than
+        what is already stored are dropped. Only a jump back of more than RESTART_GAP (device
+        restart, replay rewind), or the frame counter starting over while time goes back, clears
+        the store.
+        """
+        times = data.get(self.time_key)
+        if times is None:
+            return
+        times = np.asarray(times, dtype=np.float64).ravel()
+        if len(times) == 0:
+            return
+        if len(self.time) and times.max() < self.time[-1] and self.restarted(times, data.get("seq")):
+            self.clear()
+
+        select = None  # Index of the samples to keep, in time order, when not all of them in order
+        if np.any(times[1:] < times[:-1]):
+            select = np.argsort(times, kind="stable")
+            times = times[select]
+        if len(self.time) and times[0] < self.time[-1]:
+            late = int(np.searchsorted(times, self.time[-1]))
+            self.late += late
+            select = select[late:] if select is not None else np.arange(late, len(times))
+            times = times[late:]
+        count = len(times)
+        if count == 0:
+            return
+
+        block = np.full((len(self.channels), count), np.nan, dtype=self.dtype)
+        for name, values in data.items():
+            row = self.index.get(name)
+            if row is not None and name != self.time_key:
+                block[row] = values if select is None else np.asarray(values).ravel()[select]
+        if len(self.valve_rows) and "VALVES" in data:
+            bits = np.asarray(data["VALVES"], dtype=np.int64).ravel()
+            if select is not None:
+                bits = bits[select]
+            block[self.valve_rows] = valve_states(bits, self.valve_bits).T
+
+        if "seq" in data and len(data["seq"]):
+            seq = int(np.max(data["seq"]))
+            self.last_seq = seq if self.last_seq is None else max(seq, self.last_seq)
+        self.time.extend(times)
+        self.values.extend(block)
+        self.reduce(count)
+        self.version += 1
+
+    def restarted(self, times, seq):
+        """True when a packet older than the newest sample is a new run rather than late frames"""
+        if times.max() < self.time[-1] - RESTART_GAP:
+            return True
+        if seq is None or not len(seq):
+            return False
+        return self.last_seq is not None and int(np.max(seq)) + REORDER_FRAMES < self.last_seq
+
+    def reduce(self, count):
+        """Folds newly completed runs into each level, only touching the new entries"""
+        below_x, below_y = self.time, self.values
+        for level, run in enumerate(self.runs):
+            pending = min(self.pending[level] + count, len(below_y))
+            if pending < run:
+                self.pending[level] = pending
+                return
+            full = pending // run * run
+            x = below_x.view()[..., -pending:]
+            y = below_y.view()[:, -pending:]
+            x, y = run_min_max(x[..., :full], y[:, :full], run)
+            level_x, level_y = self.levels[level]
+            level_x.extend(x)
+            level_y.extend(y)
+            self.pending[level] = pending - full
+            count = y.shape[-1]
+            below_x, below_y = level_x, level_y
+
+    def latest(self):
+        """Newest timestamp, or None while empty"""
+        return self.time[-1] if len(self.time) else None
+
+    def window(self, channel, start=None, end=None):
+        """Times and values of a channel with start <= time <= end, as zero-copy views"""
+        t = self.time.view()
+        first = int(np.searchsorted(t, start)) if start is not None else 0
+        last = int(np.searchsorted(t, end, side="right")) if end is not None else len(t)
+        return t[first:last], self.values.view()[self.index[channel], first:last]
+
+    def history(self, channel):
+        """[(times, values), ...] for a channel, raw samples first then each coarser level"""
+        row = self.index[channel]
+        return [(self.time.view(), self.values.view()[row])] + \
+            [(level_x.view()[row], level_y.view()[row]) for level_x, level_y in self.levels]
+
+    def clear(self):
+        self.time.clear()
+        self.values.clear()
+        for level_x, level_y in self.levels:
+            level_x.clear()
+            level_y.clear()
+        self.pending = [0] * len(self.factors)
+        self.last_seq = None
@@ -0,0 +1,123 @@
+from PyQt6.QtWidgets import QWidget, QSizePolicy
+from PyQt6.QtCore import Qt, QRect, QRectF, QPointF
+from PyQt6.QtGui import QPainter, QColor, QFont, QStaticText
+import numpy as np
+from controllers.telemetry_packet import valve_states
+
+
+class ValvePanel(QWidget):
+    """Every valve's state in one widget, painted by a single paintEvent.
+
+    States are one byte per valve holding a Valve_ColorMap code. An update compares the new
+    states with the old ones and only invalidates the cells that changed, so the panel never
+    re-polishes a stylesheet and a packet that repeats the last state costs one comparison.
+    """
+
+    def __init__(self, valves, color_map, columns=2, cell_height=22, parent=None):
+        super().__init__(parent)
+        self.valves = list(valves)
+        self.index = {name: i for i, name in enumerate(self.valves)}
+        # Open/closed come from the VALVES bitfield; the remaining code means no data yet
+        self.open_code = color_map.get("green", 2)
+        self.closed_code = color_map.get("red", 0)
+        unknown = color_map.get("gray", 1)
+        self.colors = {code: QColor(name) for name, code in color_map.items()}
+        self.states = bytearray([unknown] * len(self.valves))
+        self.bits = None  # Last bitfield applied, for the unchanged-packet fast path
+        self.all_bits = (1 << len(self.valves)) - 1
+
+        self.columns = max(1, columns)
+        self.cell_height = cell_height
+        self.cells = []  # QRect per valve, laid out in resizeEvent
+        self.spare = []  # QRects of the panel no cell covers, painted as plain background
+        self.label_font = QFont("Helvetica", 8)
+        self.labels = [QStaticText(name) for name in self.valves]  # Text laid out once, not per paint
+        for label in self.labels:
+            label.prepare(font=self.label_font)
+        self.background = QColor("#242424")
+        self.text_color = QColor("white")
+        rows = -(-len(self.valves) // self.columns)
+        self.setMinimumHeight(rows * cell_height)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)  # Cells and spare rects cover every pixel
+
+    def resizeEvent(self, event):
+        width = self.width() // self.columns
+        self.cells = [QRect((i % self.columns) * width, (i // self.columns) * self.cell_height,
+                            width, self.cell_height) for i in range(len(self.valves))]
+        # Width left over by the integer division, the empty end of a partial last row, and any extra height
+        rows = -(-len(self.valves) // self.columns)
+        used = len(self.valves) - (rows - 1) * self.columns
+        self.spare = [rect for rect in (
+            QRect(width * self.columns, 0, self.width() - width * self.columns, rows * self.cell_height),
+            QRect(used * width, (rows - 1) * self.cell_height, (self.columns - used) * width, self.cell_height),
+            QRect(0, rows * self.cell_height, self.width(), self.height() - rows * self.cell_height),
+        ) if not rect.isEmpty()]
+        super().resizeEvent(event)
+
+    def set_bits(self, bits):
+        """Takes a VALVES bitfield (bit i set = valves[i] open), or a packet's column of them"""
+        if not isinstance(bits, int):
+            bits = np.asarray(bits).ravel()
+            if not len(bits):
+                return
+            bits = int(bits[-1])  # Only the newest state is shown
+        changed = self.all_bits if self.bits is None else bits ^ self.bits
+        if not changed:
+            return
+        self.bits = bits
+        cells = [i for i in range(len(self.valves)) if changed >> i & 1]
+        for i, is_open in zip(cells, valve_states(bits, cells)[0]):
+            self.states[i] = self.open_code if is_open else self.closed_code
+        self.invalidate(cells)
+
+    def set_states(self, states):
+        """Takes one Valve_ColorMap code per valve"""
+        states = bytes(np.asarray(states, dtype=np.uint8))
+        if states == self.states:
+            return
+        cells = [i for i, (old, new) in enumerate(zip(self.states, states)) if old != new]
+        self.states[:len(states)] = states[:len(self.states)]
+        self.bits = None  # No longer mirrors a bitfield
+        self.invalidate(cells)
+
+    def set_state(self, name, state):
+        """Single valve update, by name (DataEmitter.valve_changed_S)"""
+        i = self.index.get(name)
+        if i is not None and self.states[i] != state:
+            self.states[i] = int(state)
+            self.bits = None
+            self.invalidate((i,))
+
+    def invalidate(self, cells):
+        """Schedules a repaint of the given cells; Qt merges them into one paint on its next pass"""
+        if not self.cells:
+            return  # Not laid out yet, the first paint draws everything
+        if len(cells) > len(self.cells) // 2:
+            self.update()  # Cheaper to mark the whole panel than many separate cells
+            return
+        for i in cells:
+            self.update(self.cells[i])
+
+    def paintEvent(self, event):
+        """Redraws only the cells inside the invalidated region"""
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setFont(self.label_font)
+        region = event.region()
+        for rect in self.spare:
+            if region.intersects(rect):
+                painter.fillRect(rect, self.background)
+        for i, rect in enumerate(self.cells):
+            if not region.intersects(rect):
+                continue
+            painter.fillRect(rect, self.background)
+            lamp = QRectF(rect.x() + 6, rect.y() + (rect.height() - 12) / 2, 12, 12)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(self.colors.get(self.states[i], self.background))
+            painter.drawEllipse(lamp)
+            painter.setPen(self.text_color)
+            label = self.labels[i]
+            painter.drawStaticText(QPointF(rect.x() + 24, rect.y() + (rect.height() - label.size().height()) / 2),
+                                   label)
+        painter.end()
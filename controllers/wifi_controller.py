@@ -1,83 +1,168 @@
-import socket, threading
+import socket, asyncio
 from PyQt6.QtCore import QObject, pyqtSignal, QThread, Qt, QTimer, QMutex
 import time
 import random
-from misc.file_handler import load_file
+import numpy as np
+from controllers import telemetry_packet
+from controllers.command_channel import CommandChannel
+from controllers.network_engine import NetworkEngine
+
+SENSORS = telemetry_packet.SENSORS  # Channel order is fixed by the packet layout
+
+MAX_DATAGRAM = telemetry_packet.MAX_DATAGRAM
+
+
+class TelemetryProtocol(asyncio.DatagramProtocol):
+    """Hands each UDP wakeup to the ESP32 so it can drain the rest of the socket in one batch"""
+
+    def __init__(self, esp):
+        self.esp = esp
+
+    def datagram_received(self, data, addr):
+        self.esp.drain_socket(first=data)
+
+    def error_received(self, exc):
+        print(f"Receive error: {exc}")
 
-config = load_file("data/config.json")
-USE_REAL_DATA = config["USE_REAL_DATA"]
 
 class ESP32(QObject):
     """Handles ESP32 Signaling and Data Parsing"""
-    data_list = pyqtSignal(dict)
+    data_list = pyqtSignal(object, float)  # One batch of decoded frames, perf_counter time it was received
 
-    def __init__(self, tcp_port, udp_port, ip):
+    def __init__(self, tcp_port, udp_port, ip, batch_budget=512, receive=True):
         super().__init__()
         self.UDP_port = udp_port
         self.TCP_port = tcp_port
         self.ip = ip
         self.connected = False
-        self.udp_thread = None
         self.udp_socket = None
+        # All networking runs on one asyncio loop; the command link reconnects on its own
+        self.engine = NetworkEngine()
+        self.commands = CommandChannel(ip, tcp_port)
+        self.recorder = None  # Optional TelemetryRecorder that gets every raw batch
+        self.receive = receive  # False when an IngestProcess owns the telemetry socket instead
+
+        # Receive batching: at most batch_budget datagrams are drained per wakeup
+        self.batch_budget = batch_budget
+        self.receive_buffer = bytearray(batch_budget * MAX_DATAGRAM)
+        self.stats = {"wakeups_per_s": 0.0, "mean_batch": 0.0, "last_batch": 0, "max_batch": 0,
+                      "datagrams": 0, "rejected": 0}
+        self._window_start = time.perf_counter()
+        self._window_wakeups = 0
+        self._window_datagrams = 0
 
     def connect(self):
-        """Attempts to connect to available ESP32 through TCP and UDP"""
+        """Starts the network loop with the command link and the UDP receiver"""
         if self.connected:
             return True
         try:
-            with socket.create_connection((self.ip, self.TCP_port), timeout=2):
-                self.connected = True
-                self.udp_thread = threading.Thread(target=self.receive_message, daemon=True)
-                self.udp_thread.start()
+            self.engine.start()
+            if self.receive:
+                self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)  # Rides out stalls
+                self.udp_socket.bind(("0.0.0.0", self.UDP_port))
+                self.udp_socket.setblocking(False)
+                self.engine.open_datagram_endpoint(lambda: TelemetryProtocol(self), self.udp_socket)
+            self.commands.start(self.engine)
+            self.connected = True
+            return True
         except Exception as e:
             print(f"Connection error: {e}")
+            self.engine.stop()
+            if self.udp_socket:
+                self.udp_socket.close()
+                self.udp_socket = None
             return e
 
     def disconnect(self):
-        """Manually disconnect from ESP"""
+        """Manually disconnect from ESP, sockets are closed on the network thread right away"""
         if not self.connected:
             return
         self.connected = False
-        if self.udp_socket:
-            self.udp_socket.close()
-            self.udp_socket = None
-
-    def receive_message(self):
-        """Continuously receives UDP data with non-blocking socket"""
-        self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.udp_socket.settimeout(1.0)  # Avoid blocking indefinitely
-        self.udp_socket.bind(("0.0.0.0", self.UDP_port))
-        while self.connected:
+        if self.engine.running:
+            # Cleared on the loop thread, queued ahead of the shutdown, so drain_socket never sees it go
+            self.engine.call_soon(self.release_socket)
+        self.engine.stop()
+
+    def release_socket(self):
+        """Network thread: forgets the UDP socket, its transport closes it during shutdown"""
+        self.udp_socket = None
+
+    def drain_socket(self, first=b""):
+        """Reads datagrams into the preallocated buffer until the socket is empty or the budget is spent"""
+        received = time.perf_counter()
+        udp_socket = self.udp_socket  # Released on this thread, so it can't change mid-drain
+        view = memoryview(self.receive_buffer)
+        first = first[:MAX_DATAGRAM]
+        view[:len(first)] = first  # The datagram asyncio already read for us
+        filled = 0
+        count = 0
+        size = len(first)
+        while True:
+            count += 1
+            if size and size % telemetry_packet.PACKET_SIZE == 0:
+                filled += size  # Keep only whole frames so the batch stays aligned
+            else:
+                self.stats["rejected"] += 1
+            if count >= self.batch_budget or udp_socket is None:
+                break
             try:
-                data, _ = self.udp_socket.recvfrom(1024)  # Buffer size
-                decoded_data = data.decode()
-                if decoded_data:
-                    self.data_list.emit(decoded_data)
-            except socket.timeout:
-                continue
-            except Exception as e:
-                print(f"Receive error: {e}")
+                size = udp_socket.recv_into(view[filled:filled + MAX_DATAGRAM])
+            except OSError:  # Empty (BlockingIOError) or closed
                 break
 
+        if filled:
+            # Copy out once per batch, the receive buffer is reused on the next wakeup
+            payload = bytes(view[:filled])
+            if self.recorder:
+                self.recorder.append(time.time_ns(), payload)
+            records = telemetry_packet.decode(payload)
+            if len(records):
+                self.data_list.emit(records, received)
+        self.update_stats(count)
+
+    def update_stats(self, batch_size):
+        """Tracks batch sizes and wakeups, rates are refreshed once a second"""
+        self.stats["last_batch"] = batch_size
+        self.stats["max_batch"] = max(self.stats["max_batch"], batch_size)
+        self.stats["datagrams"] += batch_size
+        self._window_wakeups += 1
+        self._window_datagrams += batch_size
+
+        elapsed = time.perf_counter() - self._window_start
+        if elapsed >= 1.0:
+            self.stats["wakeups_per_s"] = self._window_wakeups / elapsed
+            self.stats["mean_batch"] = self._window_datagrams / self._window_wakeups
+            self._window_start += elapsed
+            self._window_wakeups = 0
+            self._window_datagrams = 0
+
     def send_message(self, command):
-        """Send a command over TCP"""
+        """Queues a command on the persistent TCP link, returns its sequence ID"""
         if not self.connected:
             return
-        try:
-            with socket.create_connection((self.ip, self.TCP_port)) as tcp_sock:
-                tcp_sock.sendall(f"{command}\n".encode())
-        except Exception as e:
-            print(f"Send error: {e}")
+        return self.commands.send(command)
 
 
 from PyQt6.QtCore import QThread, pyqtSignal, QTimer, Qt, QMutex
+from collections import deque
+import queue
 import time
 import random
 
+STOP = object()  # Inbox sentinel that ends DataController.run
+
+
 class DataController(QThread):
+    """Dispatches telemetry to the GUI from its own thread, sleeping until there is work.
+
+    The thread blocks on one inbox that receives data batches (from the ESP32 or a replay) and
+    the stop request; in simulation mode the wait times out exactly at the next simulated tick.
+    """
     data_signal = pyqtSignal(dict)  # Signal to send updated data
+    latency_report = pyqtSignal(dict)  # Wake-to-dispatch statistics, at most every report_interval
 
-    def __init__(self, esp_instance=None, update_interval=100):
+    def __init__(self, esp_instance=None, update_interval=100, latency=None, simulate=True):
         super().__init__()
         self.running = True
         self.esp_instance = esp_instance
@@ -88,24 +173,62 @@ class DataController(QThread):
         self.update_interval = update_interval
         self.mutex = QMutex()  # Mutex to prevent data race conditions
 
-        if not USE_REAL_DATA:
-            self.timer = QTimer()
-            self.timer.timeout.connect(self.send_data)
-            self.timer.start(self.update_interval)
+        self.simulate = simulate  # Generate fake data on the update interval
+        self.latency = latency  # Optional end-to-end LatencyTracker
+        self.inbox = queue.SimpleQueue()  # (queued at, batch or STOP, received at)
+        self.dispatch_latency = deque(maxlen=1000)  # Seconds from queued/due to emitted
+        self.report_interval = 10.0
+        self.last_report = time.perf_counter()
 
         if self.esp_instance:
-            self.esp_instance.data_list.connect(self.process_real_data, type=Qt.ConnectionType.QueuedConnection)
+            # Batches go straight from the network thread into the inbox, no extra Qt event hop
+            self.esp_instance.data_list.connect(self.submit, type=Qt.ConnectionType.DirectConnection)
+
+    def submit(self, data, received=None):
+        """Queues a batch (decoded records or a channel dict) from any thread"""
+        now = time.perf_counter()
+        self.inbox.put((now, data, received if received else now))
 
     def run(self):
+        interval = self.update_interval / 1000
+        next_tick = time.perf_counter() + interval
         while self.running:
             try:
-                if USE_REAL_DATA and self.esp_instance and self.esp_instance.connected:
-                    pass  # Real data is handled via signals
-                else:
-                    self.msleep(1)  # Prevent high CPU usage
+                timeout = max(0.0, next_tick - time.perf_counter()) if self.simulate else None
+                try:
+                    queued_at, data, received = self.inbox.get(timeout=timeout)
+                except queue.Empty:
+                    # Simulation tick is due
+                    if not self.simulate:
+                        continue
+                    self.send_data()
+                    self.record_latency(next_tick)
+                    next_tick = max(next_tick + interval, time.perf_counter())
+                    continue
+
+                if data is STOP:
+                    break
+                self.process_real_data(data, received)
+                self.record_latency(queued_at)
             except Exception as e:
                 print(f"datacontroller: {e}")
 
+    def record_latency(self, since):
+        """Stores the wake-to-dispatch delay and reports the distribution now and then"""
+        now = time.perf_counter()
+        self.dispatch_latency.append(now - since)
+        if now - self.last_report >= self.report_interval:
+            self.last_report = now
+            self.latency_report.emit(self.latency_stats())
+
+    def latency_stats(self):
+        """Wake-to-dispatch latency in ms over the recent batches"""
+        if not self.dispatch_latency:
+            return {"count": 0}
+        samples = np.fromiter(self.dispatch_latency, dtype=float) * 1000
+        return {"count": len(samples), "p50": np.percentile(samples, 50), "p95": np.percentile(samples, 95),
+                "p99": np.percentile(samples, 99), "max": samples.max()}
+
     def send_data(self):
         """Emit data at a controlled interval to prevent UI stuttering."""
         self.mutex.lock()
@@ -115,13 +238,17 @@ class DataController(QThread):
             "Force": [self.simulated_sensor_value() / 5],
             'Pitch': [self.simulated_angle_value()]
         }
+        for sensor in SENSORS:
+            simulated_data[sensor] = [self.simulated_sensor_value()]
+        simulated_data["_received"] = time.perf_counter()  # Generated counts as received
+        if self.latency:
+            self.latency.stamp("dispatch", simulated_data["_received"])
         self.data_signal.emit(simulated_data)
         self.mutex.unlock()
 
     def stop(self):
         self.running = False
-        if not USE_REAL_DATA:
-            self.timer.stop()
+        self.inbox.put((time.perf_counter(), STOP, None))  # Wakes the thread immediately
 
     def simulated_sensor_value(self):
         return round(random.uniform(1, 6), 2)
@@ -133,9 +260,15 @@ class DataController(QThread):
             self.angle_increasing = not self.angle_increasing
         return self.angle_value
 
-    def process_real_data(self, data):
-        """Processes incoming real data without blocking the UI"""
-        if isinstance(data, dict) and USE_REAL_DATA and self.esp_instance and self.esp_instance.connected:
+    def process_real_data(self, data, received=None):
+        """Processes incoming real (live or replayed) data without blocking the UI"""
+        if isinstance(data, np.ndarray):
+            data = telemetry_packet.to_channels(data)  # Column views, no per-sample work
+        if isinstance(data, dict):
+            if received:
+                data["_received"] = received  # Carried along for end-to-end latency
+                if self.latency:
+                    self.latency.stamp("dispatch", received)
             self.mutex.lock()
             self.data_signal.emit(data)
             self.mutex.unlock()
@@ -8,6 +8,19 @@ WiFiServer tcpServer(8080);  // TCP Server on port 8080
 WiFiUDP udpServer;           // UDP for telemetry
 const int udpPort = 12345;
 
+// Binary telemetry frame, must match controllers/telemetry_packet.py
+const int SENSOR_COUNT = 12;  // config.json SENSORS, in order
+struct __attribute__((packed)) TelemetryFrame {
+    char magic[2];            // "RT"
+    uint8_t version;          // 1
+    uint8_t channel_count;    // SENSOR_COUNT
+    uint32_t seq;
+    uint64_t timestamp_us;
+    float sensors[SENSOR_COUNT];
+    uint16_t valves;          // bit i = config.json VALVES[i] open
+};
+uint32_t frameSeq = 0;
+
 void setup() {
     Serial.begin(115200);
     WiFi.begin(ssid, password);
@@ -25,34 +38,52 @@ void setup() {
     udpServer.begin(udpPort);  // Start UDP server
 }
 
+WiFiClient client;               // Persistent command connection from the GUI
+unsigned long lastTelemetry = 0;
+
 void loop() {
-    WiFiClient client = tcpServer.available();  // Check for incoming TCP connection
-
-    if (client) {
-        Serial.println("TCP Client Connected");
-        while (client.connected()) {
-            if (client.available()) {
-                String command = client.readStringUntil('\n');
-                Serial.println("Received Command: " + command);
-
-                if (command == "START_ENGINE") {
-                    client.println("Engine Started");
-                } else if (command == "STOP_ENGINE") {
-                    client.println("Engine Stopped");
-                } else {
-                    client.println("Unknown Command");
-                }
-            }
+    // Accept a new command connection when there is none (the GUI keeps one open)
+    if (!client || !client.connected()) {
+        WiFiClient incoming = tcpServer.available();
+        if (incoming) {
+            client = incoming;
+            client.setNoDelay(true);
+            Serial.println("TCP Client Connected");
+        }
+    }
+
+    // Answer every complete command with exactly one line, without blocking telemetry
+    while (client && client.connected() && client.available()) {
+        String command = client.readStringUntil('\n');
+        Serial.println("Received Command: " + command);
+
+        if (command == "START_ENGINE") {
+            client.println("Engine Started");
+        } else if (command == "STOP_ENGINE") {
+            client.println("Engine Stopped");
+        } else {
+            client.println("Unknown Command");
         }
-        client.stop();
-        Serial.println("TCP Client Disconnected");
     }
 
+    if (millis() - lastTelemetry < 1000) {  // Send every 1 second
+        return;
+    }
+    lastTelemetry = millis();
+
     // Send sensor data via UDP
-    String sensorData = "Temperature: 25.3, Pressure: 1002";
+    TelemetryFrame frame = {};
+    frame.magic[0] = 'R';
+    frame.magic[1] = 'T';
+    frame.version = 1;
+    frame.channel_count = SENSOR_COUNT;
+    frame.seq = frameSeq++;
+    frame.timestamp_us = esp_timer_get_time();
+    for (int i = 0; i < SENSOR_COUNT; i++) {
+        frame.sensors[i] = 0.0f;  // Replace with real transducer readings
+    }
+    frame.valves = 0;
     udpServer.beginPacket("192.168.1.50", 12345);  // Send to Python client IP
-    udpServer.print(sensorData);
+    udpServer.write((const uint8_t*)&frame, sizeof(frame));
     udpServer.endPacket();
-
-    delay(1000);  // Send every 1 second
 }
@@ -1,9 +1,41 @@
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QLabel, QPushButton,
                              QVBoxLayout, QHBoxLayout, QTabWidget, QSizePolicy)
-from PyQt6.QtCore import Qt
-from controllers import wifi_controller
+from PyQt6.QtCore import Qt, QTimer
+from functools import partial
 from misc import file_handler
-from gui import primary_controls
+from misc.startup_profile import profile
+
+# Imported on the GUI thread once the empty window is up, one module per event loop pass. The
+# pipeline and the Controller tab come first; the plotting modules, then the graphs, after that
+PIPELINE_MODULES = ("numpy", "asyncio", "controllers.wifi_controller", "controllers.telemetry_router",
+                    "controllers.telemetry_store", "controllers.render_clock", "controllers.recorder",
+                    "controllers.latency", "gui.primary_controls")
+GRAPH_MODULES = ("matplotlib", "matplotlib.colors", "matplotlib.cm", "matplotlib.text", "matplotlib.backend_bases",
+                 "matplotlib.axes", "matplotlib.projections", "matplotlib.figure",
+                 "matplotlib.backends.backend_qt5agg", "controllers.graph_controller")
+
+
+class DeferredTab(QWidget):
+    """Tab placeholder that builds its real contents the first time it is opened"""
+
+    def __init__(self, builder):
+        super().__init__()
+        self.builder = builder
+        self.content = None
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.placeholder = QLabel("Loading...")
+        self.placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.placeholder)
+        self.setLayout(layout)
+
+    def build(self):
+        if self.content is None:
+            self.content = self.builder()
+            self.placeholder.deleteLater()
+            self.layout().addWidget(self.content)
+        return self.content
+
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -23,29 +55,191 @@ class MainWindow(QMainWindow):
         config = file_handler.load_file("data/config.json")
         if config:
             print("present")
+        self.config = config
 
         # Load Stylesheet
         styleSheet = file_handler.load_file("data/dark_style.qss", as_json=False)
         if styleSheet:
             QApplication.instance().setStyleSheet(styleSheet)
 
+        # Started once the window is on screen
+        self.esp = None
+        self.data_controller = None
+        self.recorder = None
+        self.ingest = None
+        self.replay = None
+        self.primary_controls = None
+        self.options_tab = None
+        self.graphs_loaded = False
+
+        # Init tabs; each is built the first time it is opened, so the window shows straight away
+        self.tabs = QTabWidget()
+        self.setCentralWidget(self.tabs)
+        self.tabs.addTab(DeferredTab(self.build_primary_controls), "Controller")
+        self.tabs.addTab(DeferredTab(self.build_options), "Options")
+        self.tabs.currentChanged.connect(self.open_tab)
+        QTimer.singleShot(0, self.preload)
+
+    def preload(self):
+        """Runs on the first event loop pass, once the window is up"""
+        profile.mark("window shown")
+        graph_modules = GRAPH_MODULES
+        if self.config.get("GRAPH_BACKEND") == "pyqtgraph":
+            graph_modules += ("controllers.pg_graph_controller",)
+        self.run_steps([partial(self.import_module, module) for module in PIPELINE_MODULES] + [self.start] +
+                       [partial(self.import_module, module) for module in graph_modules] + [self.load_graphs])
+
+    def run_steps(self, steps):
+        """Runs one startup step per event loop pass, so input and repaints are handled in between"""
+        if steps:
+            steps.pop(0)()
+            QTimer.singleShot(0, partial(self.run_steps, steps))
+
+    def import_module(self, module):
+        try:
+            __import__(module)  # Plain __import__ so the startup profile sees it
+        except Exception as e:
+            print(f"Preload of {module} failed: {e}")  # Raised again, properly, when it's used
+
+    def start(self):
+        """Starts the data pipeline, then builds whichever tab is showing (graphs come later)"""
+        profile.mark("modules loaded")
+        with profile.measure("telemetry pipeline"):
+            self.start_pipeline(self.config)
+        self.open_tab(self.tabs.currentIndex())
+        profile.mark("first tab built")
+
+    def load_graphs(self):
+        """Plotting modules are in: graphs of an already built Controller tab follow, one per step"""
+        profile.mark("graph modules loaded")
+        self.graphs_loaded = True
+        steps = self.primary_controls.graph_steps() if self.primary_controls else []
+        self.run_steps(steps + [self.startup_done])
+
+    def startup_done(self):
+        profile.mark("graphs built")
+        if profile.enabled:
+            QTimer.singleShot(0, profile.report)
+
+    def open_tab(self, index):
+        tab = self.tabs.widget(index)
+        if isinstance(tab, DeferredTab) and self.data_controller:
+            with profile.measure(f"tab: {self.tabs.tabText(index)}"):
+                tab.build()
+
+    def build_primary_controls(self):
+        from gui import primary_controls
+        self.primary_controls = primary_controls.PrimaryWindow(esp32=self.esp, config=self.config,
+                                                               data_controller=self.data_controller,
+                                                               router=self.router,
+                                                               render_clock=self.render_clock)
+        if self.graphs_loaded:
+            self.run_steps(self.primary_controls.graph_steps())  # Opened after startup finished
+        return self.primary_controls
+
+    def build_options(self):
+        self.options_tab = QWidget()
+        return self.options_tab
+
+    def start_pipeline(self, config):
+        """Networking, recording and routing; imported here so none of it delays the first paint"""
+        from controllers import wifi_controller, telemetry_router, telemetry_store, render_clock, recorder, latency
+
+        # End-to-end staleness of the data, from the socket to the painted frame
+        self.latency = latency.LatencyTracker()
+
+        # A replayed session owns the pipeline: live batches would interleave their timestamps with it
+        replaying = bool(config.get("REPLAY_SESSION"))
+        live = config["USE_REAL_DATA"] and not replaying
+        # Receiving, decoding and recording can run in their own process, away from the GIL
+        ingest = live and config.get("INGEST_PROCESS")
+
         # Wi-Fi Access Point
         self.esp = wifi_controller.ESP32(tcp_port=config["TCP_PORT"], udp_port=config["UDP_PORT"],
-                                          ip=config["ESP32_IP"])
-        self.data_controller = wifi_controller.DataController(esp_instance=self.esp)
+                                          ip=config["ESP32_IP"], receive=not ingest)
+        # Every raw packet is kept on disk, segments only appear once data arrives
+        segment_size = config.get("RECORDING_SEGMENT_MB", 64) * 1024 * 1024
+        self.recorder = recorder.TelemetryRecorder(
+            directory=file_handler.get_file_path(config.get("RECORDING_DIR", "recordings")),
+            segment_size=segment_size)
+        self.recorder.start()
+        if ingest:
+            # The child records the packets; side files here go into the same session
+            from controllers import ingest_process
+            self.recorder.session = self.recorder.new_session()
+            self.ingest = ingest_process.IngestProcess(udp_port=config["UDP_PORT"],
+                                                       capacity=config.get("INGEST_RING_FRAMES", 2 ** 18),
+                                                       session=str(self.recorder.session),
+                                                       segment_size=segment_size)
+            self.ingest.start()
+        else:
+            self.esp.recorder = self.recorder
+        self.data_controller = wifi_controller.DataController(esp_instance=self.esp, latency=self.latency,
+                                                              simulate=not (live or replaying))
+        self.latency.backlog = self.ingest.backlog if self.ingest else self.data_controller.inbox.qsize
+        self.data_controller.latency_report.connect(self.report_latency)
         self.data_controller.start()
+        if live:
+            self.esp.connect()
+        # One fan-out point from the data controller to every display widget, and one copy of
+        # every channel that all of them read from
+        self.store = telemetry_store.TelemetryStore.from_config(config)
+        self.router = telemetry_router.TelemetryRouter(data_controller=self.data_controller,
+                                                       latency=self.latency, store=self.store)
+        # Shared frame clock, widgets repaint at most once per tick no matter the data rate
+        self.render_clock = render_clock.RenderClock(fps=config.get("RENDER_FPS", 30),
+                                                     latency=self.latency)
+        if self.ingest:
+            self.render_clock.add_source(self.read_ingest)
 
+        # Optional playback of a recorded session through the live pipeline (REPLAY_SPEED 0 = max)
+        if replaying:
+            from controllers import replay
+            self.replay = replay.ReplayEngine(data_controller=self.data_controller, router=self.router,
+                                              session_dir=file_handler.get_file_path(config["REPLAY_SESSION"]),
+                                              speed=config.get("REPLAY_SPEED", 1))
+            self.replay.start()
 
-        # Init tabs
-        self.tabs = QTabWidget()
-        self.setCentralWidget(self.tabs)
-        # Create Tabs
-        self.primary_controls = primary_controls.PrimaryWindow(esp32=self.esp, config=config,
-                                                               data_controller=self.data_controller)
-        self.options_tab = None
+        # Latency readout on top of everything, and a periodic copy next to the recording
+        if config.get("LATENCY_OVERLAY"):
+            self.latency_overlay = latency.LatencyOverlay(self.latency, parent=self)
+        self.latency_save = QTimer(self)
+        self.latency_save.timeout.connect(self.save_latency)
+        self.latency_save.start(30000)
+
+    def closeEvent(self, event):
+        """Stops the data flow and closes the recording cleanly"""
+        if self.data_controller is None:
+            super().closeEvent(event)  # Closed before the pipeline started
+            return
+        self.esp.disconnect()
+        if self.ingest:
+            self.render_clock.remove_source(self.read_ingest)
+            self.latency.backlog = None
+            self.ingest.stop()
+        if self.replay:
+            self.replay.stop()
+        self.data_controller.stop()
+        self.data_controller.wait()
+        self.save_latency()
+        self.recorder.stop()
+        super().closeEvent(event)
 
-        # Add tabs
-        self.tabs.addTab(self.primary_controls, "Controller")
-        self.tabs.addTab(self.options_tab, "Options")
+    def read_ingest(self):
+        """Routes what the ingest process decoded since the last frame, painted in this frame"""
+        data = self.ingest.read()
+        if data is not None:
+            self.latency.stamp("dispatch", data["_received"])
+            self.router.route(data)
 
+    def save_latency(self):
+        """Keeps the latest latency distributions with the session's recording"""
+        summary = self.latency.summary()
+        summary["behind"] = self.latency.behind
+        self.recorder.save_json("latency.json", summary)
 
+    def report_latency(self, stats):
+        """Prints the data controller's wake-to-dispatch latency (ms)"""
+        if stats["count"]:
+            print(f"Dispatch latency ms: p50 {stats['p50']:.2f}, p95 {stats['p95']:.2f}, "
+                  f"p99 {stats['p99']:.2f}, max {stats['max']:.2f} ({stats['count']} batches)")
@@ -1,21 +1,26 @@
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QSplitter, QButtonGroup, QCheckBox, QComboBox)
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QSplitter, QButtonGroup, QCheckBox,
+                             QComboBox, QScrollArea)
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QColor
+from functools import partial
 from controllers import model_maker
+from controllers.valve_panel import ValvePanel
 from misc.random_items import label_maker
 import misc.file_handler
-import controllers.graph_controller
+from misc.startup_profile import profile
 
 
 
 class PrimaryWindow(QWidget):
-    def __init__(self, esp32, config, data_controller):
+    def __init__(self, esp32, config, data_controller, router, render_clock):
         super().__init__()
         """Primary tab for displaying all rocket info"""
         # // INIT Random // #
         esp32 = esp32
         config = config
         self.data_controller = data_controller
+        self.router = router
+        self.render_clock = render_clock
         # Ensure size is max
 
         # INIT Layout
@@ -25,10 +30,15 @@ class PrimaryWindow(QWidget):
         center_splitter = QSplitter(Qt.Orientation.Horizontal)
 
         # Widgets for splitter
-        right_side = RightHandController(data_controller=self.data_controller)
-        left_side = LeftHandController(data_controller=self.data_controller)
+        with profile.measure("widget: RightHandController"):
+            right_side = RightHandController(data_controller=self.data_controller, router=self.router,
+                                             render_clock=self.render_clock, config=config)
+        with profile.measure("widget: LeftHandController"):
+            left_side = LeftHandController(data_controller=self.data_controller, router=self.router,
+                                           render_clock=self.render_clock, config=config)
         center_splitter.addWidget(left_side)
         center_splitter.addWidget(right_side)
+        self.sides = (right_side, left_side)
 
 
         # Form Layout
@@ -38,14 +48,20 @@ class PrimaryWindow(QWidget):
         # Set layout
         self.setLayout(self.layout)
 
+    def graph_steps(self):
+        """One callable per graph, run by the main window once the plotting modules are imported"""
+        return [step for side in self.sides for step in side.graph_steps()]
+
     def update_from_data(self, data):
         pass
 
 class RightHandController(QWidget):
-    def __init__(self, data_controller):
+    def __init__(self, data_controller, router, render_clock, config):
         super().__init__()
         """Will form the graph and location for 3d model"""
         self.data_controller = data_controller
+        self.router = router
+        self.render_clock = render_clock
         # Splitter
         main_splitter = QSplitter(Qt.Orientation.Horizontal)
 
@@ -80,25 +96,15 @@ class RightHandController(QWidget):
         label.setAlignment(Qt.AlignmentFlag.AlignVCenter)
         top_check_layout_v.addWidget(label)
 
-        # Make the graphs
+        # Graphs are added by graph_steps() once matplotlib is in, the rest of the tab is usable before
         self.graph_list = []
-        table_test = controllers.graph_controller.GraphWidget(title="Test", x_lab="time", y_lab="LMV",
-                                                              data_controller=self.data_controller)
-        self.graph_list.append(table_test)
-
-        force_time_graph = controllers.graph_controller.GraphWidget(title="Force v Time", x_lab="time", y_lab='Force',
-                                                                    data_controller=self.data_controller)
-        self.graph_list.append(force_time_graph)
-
-        pitch_graph = controllers.graph_controller.GraphWidget(title="Pitch", x_lab="time", y_lab="Pitch",
-                                                                    data_controller=self.data_controller
-                                                                    )
-        self.graph_list.append(pitch_graph)
-
-
-        top_check_layout_v.addWidget(force_time_graph)
-        top_check_layout_v.addWidget(table_test)
-        top_check_layout_v.addWidget(pitch_graph)
+        self.graph_layout = QVBoxLayout()
+        top_check_layout_v.addLayout(self.graph_layout)
+        self.graphs = (("Force v Time", "Force"), ("Test", "LMV"), ("Pitch", "Pitch"))  # Top to bottom
+        self.graph_options = dict(x_lab="time", router=self.router, render_clock=self.render_clock,
+                                  sample_rate=config.get("SAMPLE_RATE", 10),
+                                  time_window=config.get("GRAPH_WINDOW", 10), store=self.router.store)
+        self.backend = config.get("GRAPH_BACKEND", "matplotlib")
 
         top_check_layout_h = QHBoxLayout()
         top_check_layout_h.addWidget(opt1)
@@ -121,13 +127,20 @@ class RightHandController(QWidget):
 
         # Rocket
         pitch_file = misc.file_handler.get_file_path("data/images/rocket_side_profile_pointed.png")
-        rocket_pitch = model_maker.Rocket2DImagePitch(image_path=str(pitch_file), rotate_start=90)
+        with profile.measure("  rocket: pitch"):
+            rocket_pitch = model_maker.Rocket2DImagePitch(image_path=str(pitch_file), rotate_start=90,
+                                                          render_clock=self.render_clock,
+                                                          angle_step=config.get("ATTITUDE_SPRITE_STEP", 0.5))
+        self.router.subscribe(("Pitch",), rocket_pitch.set_angle)
         right_layout.addWidget(rocket_pitch, alignment=Qt.AlignmentFlag.AlignHCenter)
         pitch_label = label_maker("Pitch", size=10)
         right_layout.addWidget(pitch_label, alignment=Qt.AlignmentFlag.AlignHCenter)
 
         roll_file = misc.file_handler.get_file_path("data/images/rocket_top_profile.png")
-        rocket_roll = model_maker.Rocket2DImagePitch(image_path=str(roll_file), scale=0.5)
+        with profile.measure("  rocket: roll"):
+            rocket_roll = model_maker.Rocket2DImagePitch(image_path=str(roll_file), scale=0.5,
+                                                         render_clock=self.render_clock,
+                                                         angle_step=config.get("ATTITUDE_SPRITE_STEP", 0.5))
         right_layout.addWidget(rocket_roll, alignment=Qt.AlignmentFlag.AlignHCenter)
         roll_label = label_maker("Roll", size=10)
         right_layout.addWidget(roll_label, alignment=Qt.AlignmentFlag.AlignHCenter)
@@ -143,22 +156,26 @@ class RightHandController(QWidget):
         main_layout.addWidget(main_splitter)
         self.setLayout(main_layout)
 
-        # Connect datacontroller signal to graphs
-        self.data_controller.data_signal.connect(self.update_graphs)
+    def graph_steps(self):
+        return [partial(self.add_graph, title, channel) for title, channel in self.graphs]
 
-    def update_graphs(self, data):
-        """Checks if new data has relevant keys for graph and update"""
-        for graph in self.graph_list:
-            if graph.x_l in data and graph.y_l in data:
-                graph.update_data(data[graph.x_l], data[graph.y_l])
+    def add_graph(self, title, channel):
+        import controllers.graph_controller
+        with profile.measure(f"  graph: {title}"):
+            graph = controllers.graph_controller.create_graph(self.backend, title=title, y_lab=channel,
+                                                              **self.graph_options)
+        self.graph_layout.addWidget(graph)
+        self.graph_list.append(graph)
 
 
 class LeftHandController(QWidget):
-    def __init__(self, data_controller):
+    def __init__(self, data_controller, router, render_clock, config):
         super().__init__()
         """Forms the left side controller with values"""
         # Data updater
         self.data_controller = data_controller
+        self.router = router
+        self.render_clock = render_clock
 
 
         # // Main Window // #
@@ -168,15 +185,44 @@ class LeftHandController(QWidget):
         label = label_maker(text="TEST")
         right_layout.addWidget(label)
 
+        # // VALVES // #
+        self.valve_panel = ValvePanel(config["VALVES"], config["Valve_ColorMap"])
+        self.router.subscribe(("VALVES",), self.valve_panel.set_bits)
+        right_layout.addWidget(self.valve_panel)
+
+        # Graphs read the router's shared store, another view of a channel adds no copy of it
         self.graph_list = []
-        # Connect datacontroller signal to graphs
-        self.data_controller.data_signal.connect(self.update_graphs)
-
-    def update_graphs(self, data):
-        """Checks if new data has relevant keys for graph and update"""
-        for graph in self.graph_list:
-            if graph.x_l in data and graph.y_l in data:
-                graph.update_data(data[graph.x_l], data[graph.y_l])
+
+        # // SENSOR GRAPHS // #
+        # The matplotlib canvas can't keep every sensor live, so the grid needs the pyqtgraph backend
+        self.sensors = config["SENSORS"] if config.get("GRAPH_BACKEND") == "pyqtgraph" else []
+        if self.sensors:
+            sensor_panel = QWidget()
+            self.sensor_layout = QGridLayout()
+            sensor_panel.setLayout(self.sensor_layout)
+            self.graph_options = dict(x_lab="time", router=self.router, render_clock=self.render_clock,
+                                      sample_rate=config.get("SAMPLE_RATE", 10),
+                                      time_window=config.get("GRAPH_WINDOW", 10), store=self.router.store)
+
+            scroll = QScrollArea()
+            scroll.setWidgetResizable(True)
+            scroll.setWidget(sensor_panel)
+            right_layout.addWidget(scroll)
+
+        self.setLayout(right_layout)
+
+    def graph_steps(self):
+        return [partial(self.add_graph, sensor) for sensor in self.sensors]
+
+    def add_graph(self, sensor):
+        import controllers.graph_controller
+        with profile.measure(f"  graph: {sensor}"):
+            graph = controllers.graph_controller.create_graph("pyqtgraph", title=sensor, y_lab=sensor,
+                                                              **self.graph_options)
+        graph.setMinimumHeight(150)
+        i = len(self.graph_list)
+        self.sensor_layout.addWidget(graph, i // 2, i % 2)
+        self.graph_list.append(graph)
 
 
 
@@ -1,14 +1,22 @@
-from gui import main_window
-from PyQt6.QtWidgets import QApplication
 import sys
+from misc.startup_profile import profile
 
 if __name__ == "__main__":
+    # Reports import and construction time per module and widget once the window is up
+    if "--profile-startup" in sys.argv:
+        sys.argv.remove("--profile-startup")
+        profile.enable()
+
+    from PyQt6.QtWidgets import QApplication
+    from gui import main_window
+
     # Init app
     app = QApplication(sys.argv)
 
     # Open window
-    window = main_window.MainWindow()
-    window.show()
+    with profile.measure("main window"):
+        window = main_window.MainWindow()
+        window.show()
 
     # Close app
-    sys.exit(app.exec())
\ No newline at end of file
+    sys.exit(app.exec())
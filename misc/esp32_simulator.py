@@ -0,0 +1,177 @@
+"""Local stand-in for the ESP32 test stand board.
+
+Speaks the firmware's TCP command protocol (one reply line per command) and streams binary
+telemetry frames for every config.json SENSORS/VALVES channel over UDP at a chosen rate, with
+optional packet loss, reordering, bursts and latency. Point the GUI at it with ESP32_IP set to
+127.0.0.1 and USE_REAL_DATA set to 1, then run for example:
+
+    python -m misc.esp32_simulator --rate 20000 --frames-per-datagram 4 --loss 0.01
+"""
+import argparse
+import asyncio
+import heapq
+import itertools
+import socket
+import time
+import numpy as np
+from controllers import telemetry_packet
+from misc.file_handler import load_file
+
+REPLIES = {"START_ENGINE": "Engine Started", "STOP_ENGINE": "Engine Stopped"}
+
+
+class ESP32Simulator:
+    """Generates firmware-compatible telemetry and command replies on localhost"""
+
+    def __init__(self, target=("127.0.0.1", 81), host="127.0.0.1", tcp_port=80, rate=1000,
+                 frames_per_datagram=1, loss=0.0, reorder=0.0, burst_every=0.0, burst_length=0.0,
+                 latency=0.0, jitter=0.0, tick=0.001, seed=None):
+        self.target = target
+        self.host = host
+        self.tcp_port = tcp_port
+        self.rate = rate
+        self.frames_per_datagram = max(1, frames_per_datagram)
+        self.loss = loss  # Probability a datagram is never sent
+        self.reorder = reorder  # Probability a datagram is held back behind later ones
+        self.burst_every = burst_every  # Seconds between bursts, 0 = off
+        self.burst_length = burst_length  # Seconds of traffic held and then released at once
+        self.latency = latency  # Seconds added to every datagram
+        self.jitter = jitter  # Extra uniform random delay, seconds
+        self.tick = tick
+        self.rng = np.random.default_rng(seed)
+
+        self.channel_count = len(telemetry_packet.SENSORS)
+        self.phase = self.rng.uniform(0, 2 * np.pi, self.channel_count)
+        self.chambers = np.array(["Chamber" in name for name in telemetry_packet.SENSORS])
+        self.valve_bits = 0
+
+        self.outbox = []  # Heap of (due time, order, datagram)
+        self.order = itertools.count()
+        self.stats = {"frames": 0, "datagrams": 0, "dropped": 0, "reordered": 0, "commands": 0}
+
+    async def run(self, duration=None):
+        server = await asyncio.start_server(self.handle_client, self.host, self.tcp_port)
+        stream = asyncio.create_task(self.stream_telemetry())
+        report = asyncio.create_task(self.report_stats())
+        print(f"Simulating ESP32: TCP {self.host}:{self.tcp_port}, UDP -> {self.target[0]}:{self.target[1]} "
+              f"at {self.rate} Hz")
+        try:
+            if duration:
+                await asyncio.sleep(duration)
+            else:
+                await asyncio.Event().wait()
+        finally:
+            stream.cancel()
+            report.cancel()
+            server.close()
+            await server.wait_closed()
+
+    async def handle_client(self, reader, writer):
+        """Answers every command with one line, like the firmware"""
+        try:
+            while line := await reader.readline():
+                command = line.decode(errors="replace").strip()
+                self.stats["commands"] += 1
+                if self.latency or self.jitter:
+                    await asyncio.sleep(self.latency + self.rng.uniform(0, self.jitter))
+                writer.write(f"{REPLIES.get(command, 'Unknown Command')}\r\n".encode())
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # Client went away, or the simulator is shutting down
+        finally:
+            writer.close()
+
+    async def stream_telemetry(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        start = time.perf_counter()
+        sent = 0
+        try:
+            while True:
+                now = time.perf_counter()
+                due = int((now - start) * self.rate) - sent
+                if due > 0:
+                    frames = self.make_frames(sent, due, now - start)
+                    step = self.frames_per_datagram * telemetry_packet.PACKET_SIZE
+                    for offset in range(0, len(frames), step):
+                        self.enqueue(frames[offset:offset + step], now - start, now)
+                    sent += due
+                    self.stats["frames"] = sent
+                self.flush(sock, now)
+                await asyncio.sleep(self.tick)
+        finally:
+            sock.close()
+
+    def make_frames(self, first_seq, count, elapsed):
+        """Vectorized sensor traces: slow sines with noise, plus spikes on the chamber channels"""
+        seq = np.arange(first_seq, first_seq + count)
+        t = seq / self.rate
+        sensors = 50 + 20 * np.sin(2 * np.pi * 0.5 * t[:, None] + self.phase)
+        sensors += self.rng.normal(0, 0.5, sensors.shape)
+        spikes = self.rng.random(count) < 0.001
+        sensors[np.ix_(spikes, self.chambers)] += 200
+
+        if int(elapsed) != int(elapsed - count / self.rate):
+            self.valve_bits ^= 1 << int(self.rng.integers(len(telemetry_packet.VALVES)))  # A valve a second
+        return telemetry_packet.encode(seq, (t * 1e6).astype(np.uint64), sensors, self.valve_bits)
+
+    def enqueue(self, datagram, elapsed, now):
+        """Applies loss, latency, reordering and bursts, then schedules the datagram"""
+        if self.loss and self.rng.random() < self.loss:
+            self.stats["dropped"] += 1
+            return
+        due = now + self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if self.reorder and self.rng.random() < self.reorder:
+            due += 3 * self.tick  # Lands behind a few later datagrams
+            self.stats["reordered"] += 1
+        if self.burst_every and elapsed % self.burst_every < self.burst_length:
+            due = max(due, now + self.burst_length - elapsed % self.burst_every)
+        heapq.heappush(self.outbox, (due, next(self.order), datagram))
+
+    def flush(self, sock, now):
+        while self.outbox and self.outbox[0][0] <= now:
+            _, _, datagram = heapq.heappop(self.outbox)
+            try:
+                sock.sendto(datagram, self.target)
+                self.stats["datagrams"] += 1
+            except BlockingIOError:
+                self.stats["dropped"] += 1  # Kernel send buffer full
+
+    async def report_stats(self):
+        while True:
+            await asyncio.sleep(1.0)
+            print(", ".join(f"{key} {value}" for key, value in self.stats.items()))
+
+
+def main():
+    config = load_file("data/config.json")
+    parser = argparse.ArgumentParser(description="Local ESP32 telemetry/command simulator")
+    parser.add_argument("--host", default="127.0.0.1", help="Address the TCP command server listens on")
+    parser.add_argument("--tcp-port", type=int, default=config["TCP_PORT"])
+    parser.add_argument("--target", default="127.0.0.1", help="Where telemetry is sent")
+    parser.add_argument("--udp-port", type=int, default=config["UDP_PORT"])
+    parser.add_argument("--rate", type=float, default=1000, help="Frames per second (10 to 50000)")
+    parser.add_argument("--frames-per-datagram", type=int, default=1)
+    parser.add_argument("--loss", type=float, default=0.0, help="Datagram loss probability")
+    parser.add_argument("--reorder", type=float, default=0.0, help="Datagram reorder probability")
+    parser.add_argument("--burst-every", type=float, default=0.0, help="Seconds between bursts")
+    parser.add_argument("--burst-length", type=float, default=0.0, help="Seconds held per burst")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--duration", type=float, default=None, help="Stop after this many seconds")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    simulator = ESP32Simulator(target=(args.target, args.udp_port), host=args.host, tcp_port=args.tcp_port,
+                               rate=args.rate, frames_per_datagram=args.frames_per_datagram, loss=args.loss,
+                               reorder=args.reorder, burst_every=args.burst_every,
+                               burst_length=args.burst_length, latency=args.latency_ms / 1000,
+                               jitter=args.jitter_ms / 1000, seed=args.seed)
+    try:
+        asyncio.run(simulator.run(args.duration))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Startup-time measurement, switched on with `python main.py --profile-startup`.
+
+Times every first-time import (inclusive of what it pulls in) and any section wrapped in
+profile.measure(), such as building a tab or a widget, then prints one report once the window
+is up. Disabled, measure() costs a single attribute check.
+"""
+import builtins
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupProfile:
+    def __init__(self):
+        self.enabled = False
+        self.started = time.perf_counter()
+        self.imports = []  # [module, ms, nesting depth], in the order they started
+        self.sections = []  # (name, ms)
+        self.marks = []  # (milestone, ms since start)
+        self.nesting = threading.local()  # Import depth, per thread
+        self.original_import = builtins.__import__
+
+    def enable(self):
+        self.enabled = True
+        self.started = time.perf_counter()
+        builtins.__import__ = self.timed_import
+
+    def timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        module = name
+        if level == 0 and name in sys.modules:
+            # "from package import module" only loads something new through the fromlist
+            new = [f"{name}.{item}" for item in fromlist or () if f"{name}.{item}" not in sys.modules]
+            module = ", ".join(new)
+        if level or not module:
+            return self.original_import(name, globals, locals, fromlist, level)
+
+        depth = getattr(self.nesting, "depth", 0)
+        entry = [module, 0.0, depth]
+        self.imports.append(entry)
+        self.nesting.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            return self.original_import(name, globals, locals, fromlist, level)
+        finally:
+            self.nesting.depth = depth
+            entry[1] = (time.perf_counter() - start) * 1000
+
+    @contextmanager
+    def measure(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sections.append((name, (time.perf_counter() - start) * 1000))
+
+    def mark(self, milestone):
+        if self.enabled:
+            self.marks.append((milestone, (time.perf_counter() - self.started) * 1000))
+
+    def report(self, min_ms=5.0, max_depth=2):
+        """Prints milestones, slow imports (outermost first) and measured sections"""
+        if not self.enabled:
+            return
+        print("\n// Startup profile (ms) //")
+        for milestone, ms in self.marks:
+            print(f"  {ms:8.1f}  {milestone}")
+        print("Imports:")
+        for module, ms, depth in self.imports:
+            if ms >= min_ms and depth <= max_depth:
+                print(f"  {ms:8.1f}  {'  ' * depth}{module}")
+        print("Construction:")
+        for name, ms in self.sections:
+            print(f"  {ms:8.1f}  {name}")
+
+
+profile = StartupProfile()
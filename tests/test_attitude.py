@@ -0,0 +1,38 @@
+import math
+import numpy as np
+from controllers.attitude import slerp, from_euler, AttitudeBuffer
+
+
+def angle(a, b):
+    return math.degrees(2 * math.acos(min(1.0, abs(float(np.dot(a, b))))))
+
+
+def test_slerp_endpoints_and_midpoint():
+    a, b = from_euler(0, 0, 0), from_euler(90, 0, 0)
+    assert np.allclose(slerp(a, b, 0), a) and np.allclose(slerp(a, b, 1), b)
+    middle = slerp(a, b, 0.5)
+    assert math.isclose(np.linalg.norm(middle), 1)
+    assert math.isclose(angle(a, middle), 45, abs_tol=1e-6)
+    assert math.isclose(angle(middle, from_euler(45, 0, 0)), 0, abs_tol=1e-4)
+
+
+def test_slerp_takes_short_arc():
+    a, b = from_euler(0, 0, 0), from_euler(90, 0, 0)
+    assert np.allclose(abs(np.dot(slerp(a, -b, 0.5), slerp(a, b, 0.5))), 1)
+
+
+def test_slerp_nearly_identical():
+    a, b = from_euler(0, 0, 0), from_euler(0.01, 0, 0)
+    q = slerp(a, b, 0.5)
+    assert math.isclose(np.linalg.norm(q), 1) and angle(a, q) < 0.01
+
+
+def test_buffer_resets_on_clock_restart():
+    buffer = AttitudeBuffer(delay=0)
+    level, tilted = from_euler(0, 0, 0), from_euler(30, 0, 0)
+    for i in range(5):
+        buffer.add(level, 100 + i * 0.1, 10 + i * 0.1)
+    for i in range(3):
+        buffer.add(tilted, i * 0.1, 11 + i * 0.1)
+    assert len(buffer.samples) == 3
+    assert np.allclose(buffer.at(11.3)[0], tilted)
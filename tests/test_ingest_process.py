@@ -0,0 +1,32 @@
+import numpy as np
+from controllers import telemetry_packet
+from controllers.ingest_process import SharedRing
+
+
+def frames(first, count):
+    data = telemetry_packet.encode(np.arange(first, first + count), 0,
+                                   np.zeros((count, len(telemetry_packet.SENSORS))), 0)
+    return telemetry_packet.decode(data)
+
+
+def test_reader_skips_ahead_when_lapped():
+    ring = SharedRing(8)
+    try:
+        ring.write(frames(0, 5), 1.0)
+        records, received = ring.read()
+        assert records["seq"].tolist() == [0, 1, 2, 3, 4] and received.tolist() == [1.0] * 5
+        assert ring.read() == (None, None)
+
+        for first in range(5, 25, 4):
+            ring.write(frames(first, 4), 2.0)
+        records, _ = ring.read()
+        assert records["seq"].tolist() == list(range(17, 25))
+        assert ring.lost == 12
+
+        ring.write(frames(25, 20), 3.0)  # One batch bigger than the whole ring
+        records, _ = ring.read()
+        assert records["seq"].tolist() == list(range(37, 45))
+        assert ring.stats()["written"] == 45 and ring.lost == 24
+        assert ring.unread() == 0
+    finally:
+        ring.close(unlink=True)
@@ -0,0 +1,80 @@
+from controllers.recorder import (Segment, TelemetryRecorder, RecordingReader, RECORD, RECORD_MAGIC, HEADER_SIZE,
+                                  INDEX_EVERY)
+
+
+def payloads(count, size=1000):
+    return [bytes([i % 251]) * (size + i % 7) for i in range(count)]
+
+
+def test_crash_keeps_committed_records(tmp_path):
+    session = tmp_path / "session"
+    session.mkdir()
+    segment = Segment(session / "segment_00000.rec", size=HEADER_SIZE * 2)
+    written = payloads(5)
+    for i, payload in enumerate(written):
+        segment.append(1000 + i, payload)
+
+    # Crash halfway through the next record: its bytes are in the file but data_end never moved
+    offset = segment.data_end
+    RECORD.pack_into(segment.map, offset, RECORD_MAGIC, 4000, 2000)
+    segment.map[offset + RECORD.size:offset + RECORD.size + 100] = b"x" * 100
+    segment.close()  # No trim, the file keeps its preallocated size like after a crash
+
+    reader = RecordingReader(session)
+    assert reader.record_count == 5
+    assert [(ns, bytes(payload)) for ns, payload in reader.records()] == \
+        [(1000 + i, payload) for i, payload in enumerate(written)]
+    assert (reader.start_ns, reader.end_ns) == (1000, 1004)
+    reader.close()
+
+
+def test_offset_for_matches_linear_scan(tmp_path):
+    segment = Segment(tmp_path / "segment_00000.rec", size=HEADER_SIZE + 2 * 1024 * 1024)
+    offsets = []
+    for i in range(1000):
+        offsets.append(segment.data_end)
+        segment.append(10 * i, b"p" * 1000)
+    index_count = int(segment.header["index_count"][0])
+    assert 1 < index_count <= 1000 * 1016 // INDEX_EVERY + 1  # Sparse, about one entry per 16 KiB
+
+    assert segment.offset_for(-5) == HEADER_SIZE
+    assert segment.offset_for(10 * 999 + 1) == segment.data_end
+    for recv_ns in (0, 5, 10, 333, 4990, 5000, 9990):
+        expected = next(offset for i, offset in enumerate(offsets) if 10 * i >= recv_ns)
+        assert segment.offset_for(recv_ns) == expected
+    assert next(segment.records(segment.offset_for(4995)))[0] == 5000  # Drops the payload view before close
+    segment.close()
+
+
+def test_segments_roll_over(tmp_path):
+    recorder = TelemetryRecorder(tmp_path, segment_size=HEADER_SIZE * 2, session=tmp_path / "session")
+    recorder.start()
+    written = payloads(200)
+    for i, payload in enumerate(written):
+        recorder.append(i, payload)
+    recorder.stop()
+
+    segments = sorted((tmp_path / "session").glob("segment_*.rec"))
+    assert len(segments) > 2
+    assert all(path.stat().st_size <= HEADER_SIZE * 2 for path in segments)
+    reader = RecordingReader(tmp_path / "session")
+    assert reader.record_count == 200
+    assert [bytes(payload) for _, payload in reader.records()] == written
+    # Seeking lands in the right segment and carries on across the later ones
+    assert [ns for ns, _ in reader.records(start_ns=150)] == list(range(150, 200))
+    reader.close()
+
+
+def test_reader_closes_empty_segments(tmp_path, monkeypatch):
+    segment = Segment(tmp_path / "segment_00000.rec", size=HEADER_SIZE * 2)
+    segment.append(1, b"data")
+    segment.close()
+    Segment(tmp_path / "segment_00001.rec", size=HEADER_SIZE * 2).close()  # Crash right after rollover
+    closed = []
+    original = Segment.close
+    monkeypatch.setattr(Segment, "close", lambda self, trim=False: closed.append(self.path.name) or original(self))
+
+    reader = RecordingReader(tmp_path)
+    assert [segment.path.name for segment in reader.segments] == ["segment_00000.rec"]
+    assert closed == ["segment_00001.rec"]
+    reader.close()
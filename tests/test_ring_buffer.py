@@ -0,0 +1,39 @@
+import numpy as np
+from controllers.ring_buffer import RingBuffer
+
+
+def test_wraparound_reads_back_in_order():
+    ring = RingBuffer(5)
+    ring.extend([0, 1, 2])
+    ring.extend([3, 4, 5, 6])
+    assert list(ring.view()) == [2, 3, 4, 5, 6]
+    assert ring.view().flags.c_contiguous
+    ring.append(7)
+    assert list(ring.view()) == [3, 4, 5, 6, 7]
+    assert ring[-1] == 7 and len(ring) == 5
+
+
+def test_extend_past_capacity_keeps_newest():
+    ring = RingBuffer(4)
+    ring.extend([1])
+    ring.extend(np.arange(10))
+    assert list(ring.view()) == [6, 7, 8, 9]
+
+
+def test_rows_wrap_together():
+    ring = RingBuffer(3, rows=2)
+    ring.extend([[0, 1], [10, 11]])
+    ring.extend([[2, 3], [12, 13]])
+    view = ring.view()
+    assert view.tolist() == [[1, 2, 3], [11, 12, 13]]
+    assert view[1].flags.c_contiguous
+    assert not view.flags.writeable
+
+
+def test_clear():
+    ring = RingBuffer(3)
+    ring.extend([1, 2, 3, 4])
+    ring.clear()
+    assert len(ring) == 0
+    ring.extend([5])
+    assert list(ring.view()) == [5]
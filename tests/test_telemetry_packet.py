@@ -0,0 +1,31 @@
+import numpy as np
+from controllers import telemetry_packet
+
+
+def test_encode_decode_round_trip():
+    count = 3
+    sensors = np.arange(count * len(telemetry_packet.SENSORS), dtype=np.float32).reshape(count, -1)
+    data = telemetry_packet.encode(np.arange(count) + 10, np.arange(count) * 1000, sensors, 0b101)
+    assert len(data) == count * telemetry_packet.PACKET_SIZE
+
+    records = telemetry_packet.decode(data)
+    assert records["seq"].tolist() == [10, 11, 12]
+    for i, name in enumerate(telemetry_packet.SENSORS):
+        assert np.array_equal(records[name], sensors[:, i])
+    channels = telemetry_packet.to_channels(records)
+    assert channels["time"].tolist() == [0.0, 0.001, 0.002]
+    assert channels["VALVES"].tolist() == [0b101] * count
+
+
+def test_decode_drops_invalid_frames():
+    good = telemetry_packet.encode([1, 2], 0, np.zeros((2, len(telemetry_packet.SENSORS))), 0)
+    bad = bytearray(good)
+    bad[0:2] = b"XX"  # First frame's magic
+    records = telemetry_packet.decode(bytes(bad))
+    assert records["seq"].tolist() == [2]
+
+
+def test_valve_states():
+    states = telemetry_packet.valve_states(np.array([0b101, 0b010]), [0, 1, 2])
+    assert states.tolist() == [[True, False, True], [False, True, False]]
+    assert telemetry_packet.valve_states(1).shape == (1, len(telemetry_packet.VALVES))
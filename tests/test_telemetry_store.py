@@ -0,0 +1,36 @@
+import numpy as np
+from controllers.telemetry_store import TelemetryStore
+
+
+def test_reduce_matches_direct_min_max():
+    store = TelemetryStore(["a", "b"], capacity=4096, factors=(4, 16), level_capacity=4096)
+    values = np.random.default_rng(1).normal(size=(2, 1000))
+    times = np.arange(1000) * 0.01
+    start = 0
+    for size in (1, 7, 30, 3, 200, 500, 259):  # Batch sizes that cut across runs
+        store.append({"time": times[start:start + size], "a": values[0, start:start + size],
+                      "b": values[1, start:start + size]})
+        start += size
+    assert start == 1000
+
+    for row, channel in enumerate(("a", "b")):
+        raw = values[row].astype(np.float32)
+        for (x, y), factor in zip(store.history(channel)[1:], (4, 16)):
+            runs = raw[:1000 // factor * factor].reshape(-1, factor)
+            assert len(y) == 2 * len(runs)
+            assert np.array_equal(np.minimum(y[0::2], y[1::2]), runs.min(axis=1))
+            assert np.array_equal(np.maximum(y[0::2], y[1::2]), runs.max(axis=1))
+            assert np.all(np.diff(x) > 0)  # Each pair in time order, pairs in run order
+            assert np.all(raw[np.rint(x / 0.01).astype(int)] == y)
+
+
+def test_late_frames_dropped_and_restart_clears():
+    store = TelemetryStore(["a"], capacity=64)
+    store.append({"time": np.array([1.0, 1.1]), "a": np.array([1, 2])})
+    store.append({"time": np.array([1.3, 1.05, 1.2]), "a": np.array([5, 0, 4])})
+    times, values = store.window("a")
+    assert times.tolist() == [1.0, 1.1, 1.2, 1.3] and values.tolist() == [1, 2, 4, 5]
+    assert store.late == 1
+
+    store.append({"time": np.array([0.0]), "a": np.array([9])})  # Far behind: a new run
+    assert store.window("a")[0].tolist() == [0.0]